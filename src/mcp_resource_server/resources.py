@@ -8,17 +8,55 @@ Provides tool functions for blob storage operations:
 - get_file: Retrieve raw file bytes from blob storage
 - get_file_info: Get filesystem path and metadata for a blob file
 - upload_image_resource: Store image bytes in blob storage with optional resizing
+- upload_image_item: Store one image of an upload_image_resources batch, reporting errors in the response
 - upload_file_resource: Store file bytes in blob storage
 """
 
+import functools
 import io
+import mmap
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Annotated
 
 from fastmcp.exceptions import ToolError
+from fastmcp.utilities.logging import get_logger
 from fastmcp.utilities.types import Image
-from mcp_mapped_resource_lib import BlobStorage, blob_id_to_path, BlobNotFoundError, InvalidBlobIdError
+from mcp_mapped_resource_lib import (
+    BlobStorage,
+    blob_id_to_path,
+    BlobNotFoundError,
+    InvalidBlobIdError,
+)
 from PIL import Image as PILImage
+from PIL import ImageChops
+from pydantic import Field
+
+try:
+    from turbojpeg import TJCS_GRAY, TJCS_RGB, TJCS_YCbCr, TJPF_GRAY, TJPF_RGB, TurboJPEG
+    HAS_TURBOJPEG = True
+except ImportError:
+    HAS_TURBOJPEG = False
+
+try:
+    import oxipng
+    HAS_OXIPNG = True
+except ImportError:
+    HAS_OXIPNG = False
+
+try:
+    import pyvips
+    HAS_PYVIPS = True
+except (ImportError, OSError):
+    # OSError: pyvips is installed but libvips itself is missing
+    HAS_PYVIPS = False
+
+logger = get_logger(__name__)
 
 
 # =============================================================================
@@ -30,39 +68,156 @@ DEFAULT_MAX_HEIGHT = 1080  # Default max height in pixels
 DEFAULT_JPEG_QUALITY = 85  # Default JPEG quality (1-100)
 MIN_JPEG_QUALITY = 1
 MAX_JPEG_QUALITY = 100
+DEFAULT_WEBP_QUALITY = 80  # Default WebP quality (PIL's own default)
+# Box-reduce by integer factors until within this multiple of the target size
+# before the resampling pass (same optimisation PIL's thumbnail() uses)
+RESIZE_REDUCING_GAP = 3.0
+# Downscale ratios from which cheaper filters replace Lanczos. PIL widens the
+# filter support with the scale factor, so large reductions stay antialiased.
+RESIZE_BILINEAR_RATIO = 2.0
+RESIZE_BOX_RATIO = 4.0
+# oxipng optimisation level for PNG output (0 is already smaller than PIL's
+# optimize=True at a fraction of the time)
+OXIPNG_LEVEL = 0
+
+# Format get_image re-encodes resized images to (e.g. "webp"); empty keeps the
+# stored image's format. Images returned without resizing are never converted.
+IMAGE_OUTPUT_FORMAT = os.environ.get("RESOURCE_SERVER_IMAGE_FORMAT", "").lower()
+if IMAGE_OUTPUT_FORMAT == "jpg":
+    IMAGE_OUTPUT_FORMAT = "jpeg"
+_IMAGE_OUTPUT_FORMATS = ("jpeg", "png", "webp")
+if IMAGE_OUTPUT_FORMAT and IMAGE_OUTPUT_FORMAT not in _IMAGE_OUTPUT_FORMATS:
+    raise ValueError(
+        f"RESOURCE_SERVER_IMAGE_FORMAT must be one of {', '.join(_IMAGE_OUTPUT_FORMATS)} "
+        f"(got {IMAGE_OUTPUT_FORMAT!r})"
+    )
+
+# Resize with libvips instead of PIL when pyvips is installed
+USE_VIPS = os.environ.get("RESOURCE_SERVER_USE_VIPS", "false").lower() in ("true", "1", "yes")
 
 # Blob storage configuration
 BLOB_STORAGE_ROOT = os.environ.get("BLOB_STORAGE_ROOT", "/mnt/blob-storage")
 HOST_BLOB_STORAGE_ROOT = os.environ.get("HOST_BLOB_STORAGE_ROOT", "")
 BLOB_STORAGE_MAX_SIZE_MB = int(os.environ.get("BLOB_MAX_SIZE_MB", "100"))
 BLOB_STORAGE_TTL_HOURS = int(os.environ.get("BLOB_TTL_HOURS", "24"))
+# Path prefixes (with trailing separator) for mapping blob paths onto the host
+_BLOB_STORAGE_ROOT_PREFIX = os.path.join(BLOB_STORAGE_ROOT, "")
+_HOST_BLOB_STORAGE_ROOT_PREFIX = os.path.join(HOST_BLOB_STORAGE_ROOT, "")
+
+# Relative JPEG output size by quality, in thousandths of the size at the default
+# quality (sources are assumed to be typical ~q85 web JPEGs). Derived from the
+# empirical compression ratio fit CR(q) = 62.644 - 0.573q, which tracks real
+# encodes far better than a linear quality/100 factor (q95 is ~1.7-2x q85, not 1.1x).
+_JPEG_SIZE_PERMILLE_BY_QUALITY = [0] + [
+    round(1000 * (62.644 - 0.573 * DEFAULT_JPEG_QUALITY) / (62.644 - 0.573 * q))
+    for q in range(MIN_JPEG_QUALITY, MAX_JPEG_QUALITY + 1)
+]
+
+# Image modes PIL can save in each output format; others are converted first
+_SAVE_MODES = {
+    "JPEG": ("L", "RGB", "CMYK"),
+    "PNG": ("1", "L", "LA", "I", "I;16", "P", "RGB", "RGBA"),
+    "WEBP": ("RGB", "RGBA"),
+}
+
+# Image format for the MIME types blob storage reports for images
+_MIME_TO_FORMAT = {
+    "image/jpeg": "jpeg",
+    "image/jpg": "jpeg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+# Blob metadata is cached in-process for up to this many seconds
+METADATA_CACHE_TTL_SECONDS = 60
+METADATA_CACHE_SIZE = 1024
+
+# get_image results are cached in-process up to this many MB (0 disables)
+RESIZE_CACHE_MAX_BYTES = int(os.environ.get("RESOURCE_SERVER_RESIZE_CACHE_MB", "128")) * 1024 * 1024
+
+# get_image max_width values to pre-render into the resize cache when an image
+# is uploaded (comma-separated, e.g. "256,512"; empty disables)
+PREWARM_WIDTHS = tuple(
+    int(width) for width in os.environ.get("RESOURCE_SERVER_PREWARM_WIDTHS", "").split(",") if width.strip()
+)
+# Pre-rendering runs in the background on a single thread, so it never takes
+# more than one core from request work (threads start on first use)
+_prewarm_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resize-prewarm")
 
 # Lazy initialization of blob storage
 _blob_storage: BlobStorage | None = None
+_blob_storage_lock = threading.Lock()
 
 
 def _get_blob_storage() -> BlobStorage:
-    """Get or create the blob storage instance."""
+    """
+    Get or create the blob storage instance.
+
+    Tools run on worker threads, so creation is locked to make sure every
+    request shares one instance. Once it exists the lock is skipped.
+    """
     global _blob_storage
     if _blob_storage is None:
-        _blob_storage = BlobStorage(
-            storage_root=BLOB_STORAGE_ROOT,
-            max_size_mb=BLOB_STORAGE_MAX_SIZE_MB,
-            default_ttl_hours=BLOB_STORAGE_TTL_HOURS,
-            enable_deduplication=True,
-        )
+        with _blob_storage_lock:
+            if _blob_storage is None:
+                _blob_storage = BlobStorage(
+                    storage_root=BLOB_STORAGE_ROOT,
+                    max_size_mb=BLOB_STORAGE_MAX_SIZE_MB,
+                    default_ttl_hours=BLOB_STORAGE_TTL_HOURS,
+                    enable_deduplication=True,
+                )
     return _blob_storage
 
 
-def _get_blob_bytes(blob_id: str) -> tuple[bytes, str | None, str | None]:
+# Lazy initialization of the libjpeg-turbo codec (loading the shared library is not free)
+_jpeg_codec: "TurboJPEG | None" = None
+
+
+def _get_jpeg_codec() -> "TurboJPEG | None":
     """
-    Read blob bytes from shared storage volume.
+    Get or create the TurboJPEG codec instance.
+
+    Returns None if PyTurboJPEG is not installed or the libturbojpeg shared
+    library cannot be loaded. The instance is safe to share between threads:
+    each decode call allocates its own libjpeg-turbo handle.
+    """
+    global _jpeg_codec, HAS_TURBOJPEG
+    if _jpeg_codec is None and HAS_TURBOJPEG:
+        try:
+            _jpeg_codec = TurboJPEG()
+        except Exception:
+            # PyTurboJPEG is installed but libturbojpeg is missing; don't retry
+            HAS_TURBOJPEG = False
+    return _jpeg_codec
+
+
+def jpeg_backend_available() -> bool:
+    """Whether JPEGs are decoded with TurboJPEG (PyTurboJPEG and libturbojpeg both present)."""
+    return _get_jpeg_codec() is not None
+
+
+@functools.lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _get_blob_path(blob_id: str) -> str:
+    """
+    Get the filesystem path for a blob ID, cached.
+
+    blob_id_to_path validates the ID with a regex and builds a pathlib.Path
+    (about 9us); the result depends only on the ID, so repeat requests for the
+    same blob reuse it. Invalid IDs raise InvalidBlobIdError and are not cached.
+    """
+    return str(blob_id_to_path(blob_id, BLOB_STORAGE_ROOT))
+
+
+def _get_blob_file(blob_id: str) -> tuple[str, str | None, str | None]:
+    """
+    Resolve a blob to its path on the shared storage volume.
 
     Args:
         blob_id: Blob URI (format: blob://TIMESTAMP-HASH.EXT)
 
     Returns:
-        Tuple of (data, content_type, filename)
+        Tuple of (file_path, content_type, filename)
 
     Raises:
         ToolError: If blob_id is invalid or blob not found
@@ -72,37 +227,195 @@ def _get_blob_bytes(blob_id: str) -> tuple[bytes, str | None, str | None]:
 
     try:
         # Get filesystem path for the blob
-        file_path = blob_id_to_path(blob_id, BLOB_STORAGE_ROOT)
+        file_path = _get_blob_path(blob_id)
 
-        # Read file data
-        with open(file_path, 'rb') as f:
-            data = f.read()
+        if not os.path.isfile(file_path):
+            raise ToolError(f"Blob file missing from shared volume: {blob_id}")
 
         # Get metadata for content type and filename
-        storage = _get_blob_storage()
-        metadata = storage.get_metadata(blob_id)
+        metadata = _get_blob_metadata(blob_id)
 
         content_type = metadata.get("mime_type")
         filename = metadata.get("filename")
 
-        return data, content_type, filename
+        return file_path, content_type, filename
 
     except InvalidBlobIdError as e:
         raise ToolError(f"Invalid blob:// URI format: {e}")
     except BlobNotFoundError as e:
         raise ToolError(f"Blob not found in storage: {e}")
+    except ToolError:
+        raise
+    except Exception as e:
+        raise ToolError(f"Failed to read blob: {e}")
+
+
+@functools.lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _cached_metadata(blob_id: str, ttl_bucket: int) -> dict:
+    """Read blob metadata from storage; ttl_bucket expires entries (see _get_blob_metadata)."""
+    return _get_blob_storage().get_metadata(blob_id)
+
+
+def _get_blob_metadata(blob_id: str) -> dict:
+    """
+    Get blob metadata, cached for up to METADATA_CACHE_TTL_SECONDS.
+
+    Metadata is written once at upload and never modified, so the only staleness
+    to guard against is a blob being cleaned up by TTL expiry; callers still check
+    that the blob file exists. Lookup errors (invalid or unknown blob) are not cached.
+    """
+    ttl_bucket = int(time.monotonic() // METADATA_CACHE_TTL_SECONDS)
+    return _cached_metadata(blob_id, ttl_bucket)
+
+
+# LRU of encoded get_image results, keyed by (blob_id, max_width, max_height, quality,
+# high_quality, output_format) and bounded by RESIZE_CACHE_MAX_BYTES, so eviction is
+# O(1) and memory stays capped. Blobs are immutable once written, so entries never go
+# stale; get_image still checks that the blob exists before serving from the cache.
+_resize_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_resize_cache_bytes = 0
+_resize_cache_lock = threading.Lock()
+
+
+def _get_cached_resize(key: tuple) -> bytes | None:
+    """Return cached get_image output for key, or None on a miss."""
+    with _resize_cache_lock:
+        data = _resize_cache.get(key)
+        if data is not None:
+            _resize_cache.move_to_end(key)
+        return data
+
+
+def _cache_resize(key: tuple, data: bytes) -> None:
+    """Cache get_image output, evicting least recently used entries to stay within budget."""
+    global _resize_cache_bytes
+    if len(data) > RESIZE_CACHE_MAX_BYTES:
+        return
+    with _resize_cache_lock:
+        if key in _resize_cache:
+            return
+        _resize_cache[key] = data
+        _resize_cache_bytes += len(data)
+        while _resize_cache_bytes > RESIZE_CACHE_MAX_BYTES:
+            _, evicted = _resize_cache.popitem(last=False)
+            _resize_cache_bytes -= len(evicted)
+
+
+def _prewarm_resize_cache(blob_id: str) -> None:
+    """
+    Pre-render PREWARM_WIDTHS variants of a newly uploaded image into the resize cache.
+
+    Runs on _prewarm_pool after upload_image_resource has returned, moving the
+    decode/resize cost of common thumbnail requests (get_image(blob_id, max_width=W))
+    off both the upload and the first read. Best effort: a variant that fails to
+    render is logged and left to get_image.
+    """
+    try:
+        file_path, content_type, _ = _get_blob_file(blob_id)
+        output_format = _get_output_format(file_path, _get_image_format(content_type))
+        width, height, _ = _get_image_header(file_path)
+    except (ToolError, OSError, ValueError) as e:
+        logger.warning("Skipping resize pre-render for %s: %s", blob_id, e)
+        return
+
+    for max_width in PREWARM_WIDTHS:
+        # Images that already fit are served as stored, not from the cache
+        if not _calculate_resize_dimensions(width, height, max_width, None)[2]:
+            continue
+        # Same key get_image uses for these arguments
+        cache_key = (blob_id, max_width, None, None, False, output_format)
+        if _get_cached_resize(cache_key) is not None:
+            continue
+        try:
+            with _map_blob_file(file_path) as mm:
+                resized_data, _, _ = _resize_image(mm, output_format, max_width, None, None)
+        except (OSError, ValueError, PILImage.DecompressionBombError) as e:
+            logger.warning("Failed to pre-render %s at max_width=%s: %s", blob_id, max_width, e)
+            continue
+        _cache_resize(cache_key, resized_data)
+
+
+def _log_prewarm_error(future: Future) -> None:
+    """Log an unexpected pre-render failure, which would otherwise vanish with its future."""
+    error = future.exception()
+    if error is not None:
+        logger.error("Resize pre-render failed: %r", error)
+
+
+def _get_host_path(container_path: str) -> str:
+    """
+    Map a blob file path under BLOB_STORAGE_ROOT to HOST_BLOB_STORAGE_ROOT.
+
+    Blob paths are built by appending to BLOB_STORAGE_ROOT, so swapping the
+    prefix is a string slice. os.path.relpath is only needed when the root was
+    configured in a form the path doesn't start with (e.g. doubled separators).
+    """
+    if container_path.startswith(_BLOB_STORAGE_ROOT_PREFIX):
+        return _HOST_BLOB_STORAGE_ROOT_PREFIX + container_path[len(_BLOB_STORAGE_ROOT_PREFIX):]
+    return os.path.join(HOST_BLOB_STORAGE_ROOT, os.path.relpath(container_path, BLOB_STORAGE_ROOT))
+
+
+def _read_blob_file(file_path: str) -> bytes:
+    """
+    Read a whole blob file in a single pass.
+
+    The file is opened unbuffered, so the read is sized from fstat and goes
+    straight into the result object without a BufferedReader copy. The kernel
+    is also told to expect a sequential scan so it can read ahead aggressively
+    for cold-cache blobs.
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f.read()
+
+
+def _map_blob_file(file_path: str) -> mmap.mmap:
+    """
+    Memory-map a blob file read-only.
+
+    Decoders read pages straight from the page cache instead of from a private
+    copy of the whole file, which keeps peak memory down for large blobs.
+    The caller is responsible for closing the returned map.
+    """
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return mm
+
+
+def _get_blob_bytes(blob_id: str) -> tuple[bytes, str | None, str | None]:
+    """
+    Read blob bytes from shared storage volume.
+
+    Args:
+        blob_id: Blob URI (format: blob://TIMESTAMP-HASH.EXT)
+
+    Returns:
+        Tuple of (data, content_type, filename)
+
+    Raises:
+        ToolError: If blob_id is invalid or blob not found
+    """
+    file_path, content_type, filename = _get_blob_file(blob_id)
+
+    try:
+        data = _read_blob_file(file_path)
     except FileNotFoundError:
         raise ToolError(f"Blob file missing from shared volume: {blob_id}")
     except Exception as e:
         raise ToolError(f"Failed to read blob: {e}")
 
+    return data, content_type, filename
+
 
 # =============================================================================
 # Response Types
 # =============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageInfoResponse:
     """Response containing image metadata without the image data."""
 
@@ -115,7 +428,7 @@ class ImageInfoResponse:
     error: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageSizeEstimate:
     """Response containing estimated dimensions after resizing."""
 
@@ -132,7 +445,7 @@ class ImageSizeEstimate:
     error: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ResourceResponse:
     """Response for resource-based file/image storage."""
 
@@ -146,7 +459,33 @@ class ResourceResponse:
     error: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
+class ImageUploadItem:
+    """One image in an upload_image_resources batch."""
+
+    data: Annotated[bytes, Field(description="Raw image bytes to store")]
+    filename: Annotated[str, Field(description="Filename for the stored image (e.g., 'photo.png')")]
+    max_width: Annotated[
+        int | None,
+        Field(description="Max width in pixels (default: 1920 if both omitted, else calculated from aspect ratio)"),
+    ] = None
+    max_height: Annotated[
+        int | None,
+        Field(description="Max height in pixels (default: 1080 if both omitted, else calculated from aspect ratio)"),
+    ] = None
+    quality: Annotated[int | None, Field(description="JPEG quality 1-100 (default: 85)")] = None
+    ttl_hours: Annotated[int | None, Field(description="Time-to-live in hours (default: 24)")] = None
+    high_quality: Annotated[
+        bool,
+        Field(description="Encode JPEGs for archival use (optimized, progressive, no chroma subsampling)"),
+    ] = False
+    palette_optimize: Annotated[
+        bool,
+        Field(description="Store few-colour PNGs (screenshots, diagrams) as grayscale/8-bit palette, losslessly"),
+    ] = False
+
+
+@dataclass(slots=True)
 class FileInfoResponse:
     """Response containing filesystem path and metadata for a blob."""
 
@@ -190,68 +529,365 @@ def _calculate_resize_dimensions(
     Returns:
         Tuple of (new_width, new_height, would_resize)
     """
-    # If both are 0, disable resizing
-    if max_width == 0 and max_height == 0:
-        return original_width, original_height, False
-
-    # Determine effective constraints
-    # If both are None, use defaults (1920x1080)
-    # If only one is None, use no constraint on that axis (maintain aspect ratio)
-    # If one is 0, use no constraint on that axis
-    if max_width is None and max_height is None:
-        # Both omitted - use defaults
-        effective_max_width = DEFAULT_MAX_DIMENSION
-        effective_max_height = DEFAULT_MAX_HEIGHT
-    elif max_width is None:
-        # Only width omitted - no width constraint, maintain aspect ratio from height
-        effective_max_width = original_width
-        effective_max_height = max_height if max_height != 0 else original_height
-    elif max_height is None:
-        # Only height omitted - no height constraint, maintain aspect ratio from width
-        effective_max_width = max_width if max_width != 0 else original_width
-        effective_max_height = original_height
-    else:
-        # Both specified - use them (handle 0 as no constraint)
-        effective_max_width = original_width if max_width == 0 else max_width
-        effective_max_height = original_height if max_height == 0 else max_height
+    # Determine effective constraints:
+    # - both None: use defaults (1920x1080)
+    # - one None or 0: no constraint on that axis (aspect ratio preserved from the other)
+    # - both 0: no constraint at all, so the check below disables resizing
+    use_defaults = max_width is None and max_height is None
+    effective_max_width = DEFAULT_MAX_DIMENSION if use_defaults else (max_width or original_width)
+    effective_max_height = DEFAULT_MAX_HEIGHT if use_defaults else (max_height or original_height)
 
     # Check if resize needed (never upscale)
     if original_width <= effective_max_width and original_height <= effective_max_height:
         return original_width, original_height, False
 
-    # Calculate scale factor to fit in bounding box
-    width_ratio = effective_max_width / original_width
-    height_ratio = effective_max_height / original_height
-    scale = min(width_ratio, height_ratio)
-
-    new_width = max(1, int(original_width * scale))
-    new_height = max(1, int(original_height * scale))
+    # Scale to fit the bounding box. Compare the width and height ratios by
+    # cross-multiplying so everything stays in exact integer arithmetic: float
+    # scaling can truncate the limiting axis one pixel short of its maximum.
+    if effective_max_width * original_height <= effective_max_height * original_width:
+        new_width = effective_max_width
+        new_height = max(1, original_height * effective_max_width // original_width)
+    else:
+        new_width = max(1, original_width * effective_max_height // original_height)
+        new_height = effective_max_height
 
     return new_width, new_height, True
 
 
+def _get_image_format(content_type: str) -> str:
+    """
+    Get the image format name for an image MIME type (e.g. "image/png" -> "png").
+
+    Common types are a dict lookup; anything else falls back to the MIME subtype.
+    """
+    mime_type = content_type.split(";", 1)[0].strip()
+    image_format = _MIME_TO_FORMAT.get(mime_type)
+    if image_format is None:
+        image_format = mime_type.split("/")[-1]
+    return image_format
+
+
+def _read_image_header(path: str) -> tuple[int, int, str | None]:
+    """
+    Read image dimensions and format without decoding pixel data.
+
+    PIL opens images lazily, so only the first few KB of the file (the
+    PNG IHDR / JPEG SOF / WebP VP8 header) are read.
+
+    Args:
+        path: Filesystem path to the image
+
+    Returns:
+        Tuple of (width, height, pil_format)
+    """
+    with PILImage.open(path) as img:
+        return img.width, img.height, img.format
+
+
+@functools.lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _get_image_header(path: str) -> tuple[int, int, int]:
+    """
+    Get (width, height, file_size_bytes) for an image blob file, cached by path.
+
+    Blob files are content-addressed and never rewritten, so the header can be
+    cached for the life of the process. Callers resolve the path through
+    _get_blob_file first, which fails for blobs that have since been removed.
+    """
+    width, height, _ = _read_image_header(path)
+    return width, height, os.path.getsize(path)
+
+
+@functools.lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _keeps_source_format(path: str) -> bool:
+    """
+    Whether an image blob has transparency or several frames, cached by path.
+
+    Such images are sent in their stored format rather than converted to
+    IMAGE_OUTPUT_FORMAT, so alpha and animation survive. Only the header is
+    parsed (plus the first frame for GIF).
+    """
+    with PILImage.open(path) as img:
+        return _has_transparency(img) or getattr(img, "is_animated", False)
+
+
+def _has_transparency(img: PILImage.Image) -> bool:
+    """
+    Whether an image has an alpha channel or a transparent colour (tRNS, GIF).
+
+    Same test as Image.has_transparency_data, which needs Pillow 10.1.
+    """
+    return img.mode in ("RGBA", "RGBa", "LA", "La", "PA") or "transparency" in img.info
+
+
+def _get_output_format(path: str, image_format: str) -> str:
+    """Get the format get_image sends a resized image blob in."""
+    if not IMAGE_OUTPUT_FORMAT or IMAGE_OUTPUT_FORMAT == image_format or _keeps_source_format(path):
+        return image_format
+    return IMAGE_OUTPUT_FORMAT
+
+
+def _decode_image(
+    img: PILImage.Image,
+    image_data: bytes | mmap.mmap,
+    target_size: tuple[int, int],
+) -> PILImage.Image:
+    """
+    Fully decode a lazily opened image.
+
+    JPEGs are decoded with libjpeg-turbo (PyTurboJPEG) when it is installed,
+    which is considerably faster than PIL's decoder for large images. The IDCT
+    is scaled to the smallest supported factor (1/8, 1/4, 3/8, 1/2, ...) that
+    still covers target_size, so most of a large downscale happens for free
+    during decode. All other formats, and JPEGs TurboJPEG cannot convert to
+    RGB (e.g. CMYK), are left to PIL.
+
+    Args:
+        img: Image opened with PILImage.open (header parsed, pixels not loaded)
+        image_data: Raw image bytes backing img
+        target_size: (width, height) the image will be resized to
+
+    Returns:
+        PIL image ready for processing, at least target_size in both dimensions
+    """
+    if img.format != "JPEG":
+        return img
+
+    jpeg = _get_jpeg_codec()
+    if jpeg is None:
+        return img
+
+    try:
+        width, height, _, colorspace = jpeg.decode_header(image_data)
+
+        # Smallest downscaling factor whose output still covers the target
+        target_width, target_height = target_size
+        candidates = [
+            (num, denom)
+            for num, denom in jpeg.scaling_factors
+            if num < denom
+            and (width * num + denom - 1) // denom >= target_width
+            and (height * num + denom - 1) // denom >= target_height
+        ]
+        scaling_factor = min(candidates, key=lambda f: f[0] / f[1]) if candidates else None
+
+        if colorspace == TJCS_GRAY:
+            pixels = jpeg.decode(image_data, pixel_format=TJPF_GRAY, scaling_factor=scaling_factor)[:, :, 0]
+        elif colorspace in (TJCS_RGB, TJCS_YCbCr):
+            pixels = jpeg.decode(image_data, pixel_format=TJPF_RGB, scaling_factor=scaling_factor)
+        else:
+            return img
+        return PILImage.fromarray(pixels)
+    except Exception:
+        # Stream TurboJPEG can't decode - let PIL handle it
+        return img
+
+
+def _resize_image_vips(
+    image_data: bytes | mmap.mmap,
+    pil_format: str,
+    original_width: int,
+    new_width: int,
+    original_height: int,
+    new_height: int,
+    quality: int | None,
+    high_quality: bool = False,
+) -> bytes | None:
+    """
+    Resize and re-encode an image with libvips.
+
+    libvips streams the image in tiles instead of holding the fully decoded
+    image in memory, which matters for very large blobs.
+
+    Returns:
+        Encoded image bytes, or None if libvips cannot handle this image
+        (the caller then falls back to PIL)
+    """
+    if pil_format == "JPEG":
+        save_suffix = f".jpg[Q={quality or DEFAULT_JPEG_QUALITY}"
+        if high_quality:
+            save_suffix += ",optimize_coding,interlace,subsample_mode=off"
+        else:
+            save_suffix += ",subsample_mode=on"
+        save_suffix += "]"
+    elif pil_format == "WEBP":
+        save_suffix = f".webp[Q={quality or DEFAULT_WEBP_QUALITY}]"
+    elif pil_format == "PNG":
+        save_suffix = ".png"
+    else:
+        return None
+
+    # pyvips only takes bytes buffers (not mmap or memoryview). Copying the
+    # compressed file is cheap next to the decode, which vips still streams.
+    if not isinstance(image_data, bytes):
+        image_data = bytes(image_data)
+
+    try:
+        image = pyvips.Image.new_from_buffer(image_data, "", access="sequential")
+        image = image.resize(
+            new_width / original_width,
+            vscale=new_height / original_height,
+            kernel="lanczos3",
+        )
+        # JPEG has no alpha channel
+        if pil_format == "JPEG" and image.hasalpha():
+            image = image.flatten()
+        return image.write_to_buffer(save_suffix)
+    except pyvips.Error:
+        return None
+
+
+def _select_resample_filter(
+    source_size: tuple[int, int],
+    target_size: tuple[int, int],
+) -> PILImage.Resampling:
+    """
+    Pick the resampling filter for a resize.
+
+    Lanczos only visibly beats cheaper filters near 1:1. For a 2x or larger
+    reduction BILINEAR is about twice as fast, and from 4x BOX (area
+    averaging) is about four times as fast, with no perceptible difference.
+
+    Args:
+        source_size: (width, height) of the decoded image
+        target_size: (width, height) to resize to
+
+    Returns:
+        PIL resampling filter
+    """
+    ratio = max(source_size[0] / target_size[0], source_size[1] / target_size[1])
+    if ratio >= RESIZE_BOX_RATIO:
+        return PILImage.Resampling.BOX
+    if ratio >= RESIZE_BILINEAR_RATIO:
+        return PILImage.Resampling.BILINEAR
+    return PILImage.Resampling.LANCZOS
+
+
+def _reduce_png_colors(img: PILImage.Image) -> PILImage.Image | None:
+    """
+    Losslessly reduce an image to grayscale or an 8-bit palette for PNG output.
+
+    Screenshots, diagrams and other non-photographic images rarely use more than
+    256 colours; stored as L or P instead of RGB(A) the PNG is several times
+    smaller and faster to decode. Images with real transparency or more than
+    256 colours (other than pure grays) are left alone.
+
+    Args:
+        img: Decoded image
+
+    Returns:
+        Reduced image, or None if it can't be reduced without loss
+    """
+    if img.mode == "RGBA":
+        if img.getchannel("A").getextrema() != (255, 255):
+            return None
+        img = img.convert("RGB")
+    elif img.mode != "RGB":
+        return None
+
+    colors = img.getcolors(maxcolors=256)
+    if colors is None:
+        red, green, blue = img.split()
+        if ImageChops.difference(red, green).getbbox() or ImageChops.difference(green, blue).getbbox():
+            return None
+        return img.convert("L")
+
+    if all(r == g == b for _, (r, g, b) in colors):
+        return img.convert("L")
+
+    # Map onto a palette of exactly the colours present, so no pixel changes
+    palette = PILImage.new("P", (1, 1))
+    palette.putpalette([channel for _, rgb in colors for channel in rgb])
+    return img.quantize(palette=palette, dither=PILImage.Dither.NONE)
+
+
+def _convert_for_save(img: PILImage.Image, pil_format: str) -> PILImage.Image:
+    """
+    Convert an image to a mode that pil_format can be saved in.
+
+    Needed once get_image re-encodes to another format (a CMYK JPEG can't be
+    written as PNG, nor a 16-bit PNG as JPEG). 16-bit images are scaled down
+    to 8 bits rather than clipped, and alpha is kept where the format has it.
+    Formats without an entry in _SAVE_MODES are left to PIL.
+    """
+    save_modes = _SAVE_MODES.get(pil_format)
+    if save_modes is None or img.mode in save_modes:
+        return img
+    if img.mode.startswith("I"):
+        return img.convert("I").point(lambda value: value / 256).convert("L")
+    if pil_format == "JPEG":
+        return img.convert("RGB")
+    return img.convert("RGBA" if _has_transparency(img) else "RGB")
+
+
+@functools.lru_cache(maxsize=64)
+def _get_save_options(pil_format: str, quality: int | None, high_quality: bool = False) -> dict:
+    """
+    Get PIL save() keyword arguments for an output format.
+
+    Cached per (format, quality, high_quality): requests cluster on a few thumbnail
+    settings, so the options are built once rather than on every resize. The returned
+    dict is shared and must not be modified.
+    """
+    if pil_format == "JPEG":
+        if high_quality:
+            # Archival output: optimized Huffman tables, progressive scans, full-resolution chroma
+            return {
+                "quality": quality or DEFAULT_JPEG_QUALITY,
+                "optimize": True,
+                "progressive": True,
+                "subsampling": 0,
+            }
+        # Fast baseline 4:2:0 encode: the optimize pass roughly doubles encode time for ~10% size
+        return {
+            "quality": quality or DEFAULT_JPEG_QUALITY,
+            "optimize": False,
+            "progressive": False,
+            "subsampling": 2,
+        }
+    if pil_format == "PNG":
+        if HAS_OXIPNG:
+            # Write uncompressed and let oxipng do the (much faster) optimisation pass
+            return {"compress_level": 0}
+        return {"optimize": True}
+    if pil_format == "WEBP":
+        return {"quality": quality or DEFAULT_WEBP_QUALITY, "method": 4}
+    return {}
+
+
 def _resize_image(
-    image_data: bytes,
-    image_format: str,
+    image_data: bytes | mmap.mmap,
+    image_format: str | None,
     max_width: int | None,
     max_height: int | None,
     quality: int | None,
+    high_quality: bool = False,
+    palette_optimize: bool = False,
 ) -> tuple[bytes, int, int]:
     """
     Resize image data, returning new bytes and dimensions.
 
     Args:
-        image_data: Raw image bytes
-        image_format: Format string (png, jpeg, etc.)
+        image_data: Raw image bytes, or a memory-mapped blob file
+        image_format: Output format string (png, jpeg, etc.), or None to keep
+                      the format detected from image_data
         max_width: Maximum width (0 to disable, None for default)
         max_height: Maximum height (0 to disable, None for default)
-        quality: JPEG quality (ignored for non-JPEG)
+        quality: JPEG/WebP quality (ignored for other formats)
+        high_quality: Encode JPEGs with optimized, progressive, 4:4:4 settings
+                      instead of fast baseline 4:2:0 (ignored for non-JPEG)
+        palette_optimize: Store PNGs as grayscale or 8-bit palette when that is
+                          lossless, even if no resize is needed (ignored for non-PNG)
 
     Returns:
         Tuple of (resized_bytes, new_width, new_height)
     """
-    # Load image
-    img = PILImage.open(io.BytesIO(image_data))
+    # Open image (lazy - only the header is parsed here). A memory-mapped
+    # file is already a seekable file object, so PIL reads it directly.
+    if isinstance(image_data, mmap.mmap):
+        image_data.seek(0)
+        img = PILImage.open(image_data)
+    else:
+        img = PILImage.open(io.BytesIO(image_data))
     original_width, original_height = img.size
 
     # Calculate new dimensions
@@ -259,32 +895,73 @@ def _resize_image(
         original_width, original_height, max_width, max_height
     )
 
-    if not should_resize:
-        return image_data, original_width, original_height
+    # Normalize format for PIL
+    pil_format = (image_format or img.format or "PNG").upper()
+    if pil_format == "JPG":
+        pil_format = "JPEG"
 
-    # Resize using high-quality Lanczos filter
-    img = img.resize((new_width, new_height), PILImage.Resampling.LANCZOS)
+    reduce_colors = palette_optimize and pil_format == "PNG"
+
+    if not should_resize and not reduce_colors:
+        return bytes(image_data), original_width, original_height
+
+    # Format conversions (and the mode changes they need) stay on the PIL path
+    if USE_VIPS and HAS_PYVIPS and not reduce_colors and img.format == pil_format:
+        resized = _resize_image_vips(
+            image_data,
+            pil_format,
+            original_width,
+            new_width,
+            original_height,
+            new_height,
+            quality,
+            high_quality,
+        )
+        if resized is not None:
+            return resized, new_width, new_height
+
+    img = _decode_image(img, image_data, (new_width, new_height))
+
+    # For JPEGs still on the PIL path, let libjpeg scale down by 1/2, 1/4 or 1/8
+    # during decode (DCT-domain scaling). draft() never goes below the target size,
+    # so the Lanczos pass below still produces the exact dimensions.
+    if img.format == "JPEG":
+        img.draft("RGB", (new_width, new_height))
+
+    # Convert to a mode the output format can store before resampling. For JPEG
+    # this drops alpha so the filter works on 3 channels instead of 4, and
+    # converts palette images, which PIL would otherwise resize with NEAREST
+    # regardless of the filter requested.
+    img = _convert_for_save(img, pil_format)
+
+    # Resize (unless scaled decode already hit the target), with the filter chosen
+    # from what is left of the downscale after draft()/TurboJPEG scaling.
+    # reducing_gap lets PIL do a cheap box reduce first for large downscales.
+    if img.size != (new_width, new_height):
+        img = img.resize(
+            (new_width, new_height),
+            _select_resample_filter(img.size, (new_width, new_height)),
+            reducing_gap=RESIZE_REDUCING_GAP,
+        )
+
+    if reduce_colors:
+        reduced = _reduce_png_colors(img)
+        if reduced is not None:
+            img = reduced
+        elif not should_resize:
+            # Nothing to gain from re-encoding
+            return bytes(image_data), original_width, original_height
 
     # Save to bytes
     output = io.BytesIO()
 
-    # Normalize format for PIL
-    pil_format = image_format.upper()
-    if pil_format == "JPG":
-        pil_format = "JPEG"
+    img.save(output, format=pil_format, **_get_save_options(pil_format, quality, high_quality))
+    resized_data = output.getvalue()
 
-    save_kwargs: dict = {}
-    if pil_format == "JPEG":
-        save_kwargs["quality"] = quality or DEFAULT_JPEG_QUALITY
-        save_kwargs["optimize"] = True
-        # Ensure RGB mode for JPEG (no alpha channel)
-        if img.mode in ("RGBA", "LA", "P"):
-            img = img.convert("RGB")
-    elif pil_format == "PNG":
-        save_kwargs["optimize"] = True
+    if pil_format == "PNG" and HAS_OXIPNG:
+        resized_data = oxipng.optimize_from_memory(resized_data, level=OXIPNG_LEVEL)
 
-    img.save(output, format=pil_format, **save_kwargs)
-    return output.getvalue(), new_width, new_height
+    return resized_data, new_width, new_height
 
 
 def _estimate_compressed_size(
@@ -293,35 +970,74 @@ def _estimate_compressed_size(
     original_height: int,
     new_width: int,
     new_height: int,
-    image_format: str,
     quality: int | None,
 ) -> int:
     """
     Estimate file size after resize (approximation).
 
-    This uses a simple ratio-based calculation. Actual size depends
-    on image content and compression efficiency.
+    This scales the original size by the pixel ratio and, for JPEG, by the
+    expected size change from re-encoding at the given quality. Actual size
+    depends on image content and compression efficiency. Pass quality only
+    for JPEG output; None means no quality factor is applied.
     """
-    # Calculate pixel ratio
-    original_pixels = original_width * original_height
-    new_pixels = new_width * new_height
-    pixel_ratio = new_pixels / original_pixels if original_pixels > 0 else 1.0
-
     # Estimate based on pixel ratio
-    estimated = int(original_size * pixel_ratio)
+    original_pixels = original_width * original_height
+    estimated = original_size
+    if original_pixels > 0:
+        estimated = original_size * new_width * new_height // original_pixels
 
     # Apply quality factor for JPEG
-    if image_format.lower() in ("jpeg", "jpg") and quality:
-        # Quality affects size roughly linearly between 50-100
-        quality_factor = quality / 100
-        estimated = int(estimated * quality_factor)
+    if quality:
+        estimated = estimated * _JPEG_SIZE_PERMILLE_BY_QUALITY[quality] // 1000
 
     return max(estimated, 100)  # Minimum 100 bytes
 
 
+def _upload_blob(
+    data: bytes,
+    filename: str,
+    tags: list[str],
+    ttl_hours: int | None,
+) -> ResourceResponse:
+    """
+    Store data in blob storage and build the ResourceResponse for it.
+
+    The response is always built from the stored metadata. With deduplication,
+    upload_blob may return an existing blob whose filename and TTL are the
+    original uploader's, and its result doesn't say whether that happened, so
+    the metadata is the only reliable source.
+    """
+    storage = _get_blob_storage()
+    result = storage.upload_blob(
+        data=data,
+        filename=filename,
+        tags=tags,
+        ttl_hours=ttl_hours,
+    )
+    blob_id = result["blob_id"]
+    metadata = storage.get_metadata(blob_id)
+
+    expires_at = metadata.get("expires_at")
+    if expires_at is None:
+        # Metadata stores creation time and TTL rather than the expiry itself
+        created_at = datetime.fromisoformat(metadata["created_at"])
+        ttl = metadata.get("ttl_hours") or BLOB_STORAGE_TTL_HOURS
+        expires_at = (created_at + timedelta(hours=ttl)).isoformat()
+
+    return ResourceResponse(
+        success=True,
+        resource_id=blob_id,
+        filename=metadata["filename"],
+        mime_type=metadata["mime_type"],
+        size_bytes=metadata["size_bytes"],
+        sha256=result["sha256"],
+        expires_at=expires_at,
+    )
+
+
 def _validate_quality(quality: int | None) -> None:
     """Validate quality parameter if provided."""
-    if quality is not None and (quality < MIN_JPEG_QUALITY or quality > MAX_JPEG_QUALITY):
+    if quality is not None and not MIN_JPEG_QUALITY <= quality <= MAX_JPEG_QUALITY:
         raise ToolError(f"quality must be between {MIN_JPEG_QUALITY} and {MAX_JPEG_QUALITY}")
 
 
@@ -335,6 +1051,7 @@ def get_image(
     max_width: int | None = None,
     max_height: int | None = None,
     quality: int | None = None,
+    high_quality: bool = False,
 ) -> Image:
     """
     Retrieve and resize an image from blob storage.
@@ -351,13 +1068,17 @@ def get_image(
         max_height: Maximum height in pixels. If omitted while max_width is specified,
                     height will be calculated to maintain aspect ratio. If both are omitted,
                     defaults to 1080. Set to 0 with max_width=0 to disable resizing.
-        quality: JPEG compression quality (1-100). Default: 85. Only applies to JPEG
-                 images; ignored for PNG/GIF/WebP.
+        quality: Compression quality (1-100) for JPEG (default 85) and WebP (default 80)
+                 output; ignored for PNG/GIF.
+        high_quality: Encode JPEGs for archival use (optimized, progressive, no chroma
+                      subsampling). Slower and larger; the default fast baseline
+                      encode is meant for display.
 
     Returns:
         Image object for rendering. The image is resized to fit
         within the specified constraints while preserving aspect ratio. Small
-        images are never upscaled.
+        images are never upscaled. Resized images are re-encoded in
+        RESOURCE_SERVER_IMAGE_FORMAT when that is set.
 
     Raises:
         ToolError: If the blob is not found, not an image, or quality is invalid
@@ -383,19 +1104,54 @@ def get_image(
     """
     _validate_quality(quality)
 
-    data, content_type, _ = _get_blob_bytes(blob_id)
+    file_path, content_type, _ = _get_blob_file(blob_id)
 
     # Validate that this is an image
     if not content_type or not content_type.startswith("image/"):
         raise ToolError(f"Blob is not an image (content-type: {content_type})")
 
     # Extract format from content-type (e.g., "image/png" -> "png")
-    image_format = content_type.split("/")[-1].split(";")[0]
+    image_format = _get_image_format(content_type)
+
+    # Images that already fit are returned as stored. The (cached) header is
+    # enough to tell, and the original isn't worth a slot in the resize cache.
+    original_width, original_height, _ = _get_image_header(file_path)
+    _, _, should_resize = _calculate_resize_dimensions(
+        original_width, original_height, max_width, max_height
+    )
+    if not should_resize:
+        try:
+            return Image(data=_read_blob_file(file_path), format=image_format)
+        except Exception as e:
+            raise ToolError(f"Failed to read blob: {e}")
+
+    try:
+        output_format = _get_output_format(file_path, image_format)
+    except Exception as e:
+        raise ToolError(f"Failed to read image: {e}")
+
+    # Repeat requests with the same parameters skip decode/resize/encode entirely
+    cache_key = (blob_id, max_width, max_height, quality, high_quality, output_format)
+    resized_data = _get_cached_resize(cache_key)
+
+    if resized_data is None:
+        try:
+            mm = _map_blob_file(file_path)
+        except Exception as e:
+            raise ToolError(f"Failed to read blob: {e}")
 
-    # Resize the image
-    resized_data, _, _ = _resize_image(data, image_format, max_width, max_height, quality)
+        # Resize the image straight from the mapped file
+        try:
+            with mm:
+                resized_data, _, _ = _resize_image(
+                    mm, output_format, max_width, max_height, quality, high_quality
+                )
+        except Exception as e:
+            raise ToolError(f"Failed to resize image: {e}")
 
-    return Image(data=resized_data, format=image_format)
+        _cache_resize(cache_key, resized_data)
+
+    return Image(data=resized_data, format=output_format)
 
 
 def get_image_info(blob_id: str) -> ImageInfoResponse:
@@ -432,18 +1188,17 @@ def get_image_info(blob_id: str) -> ImageInfoResponse:
         # ImageInfoResponse(success=True, width=2048, height=1536,
         #                   format='png', file_size_bytes=524288)
     """
-    data, content_type, _ = _get_blob_bytes(blob_id)
+    container_path, content_type, _ = _get_blob_file(blob_id)
 
     # Validate that this is an image
     if not content_type or not content_type.startswith("image/"):
         raise ToolError(f"Blob is not an image (content-type: {content_type})")
 
     # Extract format from content-type (e.g., "image/png" -> "png")
-    image_format = content_type.split("/")[-1].split(";")[0]
+    image_format = _get_image_format(content_type)
 
-    # Get dimensions using PIL
-    img = PILImage.open(io.BytesIO(data))
-    width, height = img.size
+    # Get dimensions from the image header only (no full read or decode)
+    width, height, file_size = _get_image_header(container_path)
 
     # Build response with conditional host_path
     response_data = {
@@ -451,15 +1206,12 @@ def get_image_info(blob_id: str) -> ImageInfoResponse:
         "width": width,
         "height": height,
         "format": image_format,
-        "file_size_bytes": len(data),
+        "file_size_bytes": file_size,
     }
 
     # Only include host_path if configured
     if HOST_BLOB_STORAGE_ROOT:
-        container_path = blob_id_to_path(blob_id, BLOB_STORAGE_ROOT)
-        relative_path = os.path.relpath(container_path, BLOB_STORAGE_ROOT)
-        host_path = os.path.join(HOST_BLOB_STORAGE_ROOT, relative_path)
-        response_data["host_path"] = host_path
+        response_data["host_path"] = _get_host_path(container_path)
 
     return ImageInfoResponse(**response_data)
 
@@ -517,27 +1269,26 @@ def get_image_size_estimate(
     """
     _validate_quality(quality)
 
-    data, content_type, _ = _get_blob_bytes(blob_id)
+    file_path, content_type, _ = _get_blob_file(blob_id)
 
     # Validate that this is an image
     if not content_type or not content_type.startswith("image/"):
         raise ToolError(f"File is not an image (content-type: {content_type})")
 
     # Extract format from content-type (e.g., "image/png" -> "png")
-    image_format = content_type.split("/")[-1].split(";")[0]
+    image_format = _get_image_format(content_type)
 
-    # Get original dimensions using PIL
-    img = PILImage.open(io.BytesIO(data))
-    original_width, original_height = img.size
-    original_size = len(data)
+    # Get original dimensions from the image header only (no full read or decode)
+    original_width, original_height, original_size = _get_image_header(file_path)
 
     # Calculate estimated dimensions
     estimated_width, estimated_height, would_resize = _calculate_resize_dimensions(
         original_width, original_height, max_width, max_height
     )
 
-    # Determine effective quality
-    effective_quality = quality or DEFAULT_JPEG_QUALITY
+    # Determine effective quality (JPEG only)
+    is_jpeg = image_format.lower() in ("jpeg", "jpg")
+    effective_quality = (quality or DEFAULT_JPEG_QUALITY) if is_jpeg else None
 
     # Estimate compressed size
     estimated_size = _estimate_compressed_size(
@@ -546,8 +1297,7 @@ def get_image_size_estimate(
         original_height,
         estimated_width,
         estimated_height,
-        image_format,
-        effective_quality if image_format.lower() in ("jpeg", "jpg") else None,
+        effective_quality,
     )
 
     return ImageSizeEstimate(
@@ -560,7 +1310,7 @@ def get_image_size_estimate(
         estimated_size_bytes=estimated_size,
         would_resize=would_resize,
         format=image_format,
-        quality=effective_quality if image_format.lower() in ("jpeg", "jpg") else None,
+        quality=effective_quality,
     )
 
 
@@ -594,6 +1344,8 @@ def upload_image_resource(
     max_height: int | None = None,
     quality: int | None = None,
     ttl_hours: int | None = None,
+    high_quality: bool = False,
+    palette_optimize: bool = False,
 ) -> ResourceResponse:
     """
     Store raw image bytes in shared blob storage, optionally resizing, returning a resource identifier.
@@ -618,16 +1370,22 @@ def upload_image_resource(
                  images; ignored for PNG/GIF/WebP.
         ttl_hours: Time-to-live in hours. Default: 24. After this time, the blob may
                    be cleaned up from storage.
+        high_quality: Encode JPEGs for archival use (optimized, progressive, no chroma
+                      subsampling). Slower and larger; the default fast baseline
+                      encode is meant for display.
+        palette_optimize: Store PNGs with few colours (screenshots, diagrams) as
+                          grayscale or 8-bit palette images. Lossless; applied even
+                          when no resize is needed. Ignored for other formats.
 
     Returns:
         ResourceResponse with:
         - success: Whether the operation succeeded
         - resource_id: Unique identifier for the stored blob (format: blob://TIMESTAMP-HASH.EXT)
-        - filename: Filename of the stored image (from metadata)
-        - mime_type: MIME type of the stored image (from metadata)
-        - size_bytes: Size of the stored image in bytes (from metadata)
-        - sha256: SHA256 hash of the image data for deduplication (from upload result)
-        - expires_at: ISO 8601 timestamp when the blob expires (from metadata)
+        - filename: Filename of the stored image
+        - mime_type: MIME type of the stored image
+        - size_bytes: Size of the stored image in bytes
+        - sha256: SHA256 hash of the image data for deduplication
+        - expires_at: ISO 8601 timestamp when the blob expires
         - error: Error message if unsuccessful
 
     Raises:
@@ -656,34 +1414,18 @@ def upload_image_resource(
         if not filename:
             raise ToolError("filename is required")
 
-        # Detect image format from the image data
-        img = PILImage.open(io.BytesIO(data))
-        image_format = img.format.lower() if img.format else "png"
-
-        # Resize the image
-        resized_data, _, _ = _resize_image(data, image_format, max_width, max_height, quality)
-
-        # Store in blob storage
-        storage = _get_blob_storage()
-        result = storage.upload_blob(
-            data=resized_data,
-            filename=filename,
-            tags=["resource-server", "image"],
-            ttl_hours=ttl_hours,
+        # Resize the image, keeping the format detected from the image data
+        resized_data, _, _ = _resize_image(
+            data, None, max_width, max_height, quality, high_quality, palette_optimize
         )
 
-        # Get metadata to retrieve additional fields
-        metadata = storage.get_metadata(result["blob_id"])
-
-        return ResourceResponse(
-            success=True,
-            resource_id=result["blob_id"],
-            filename=metadata["filename"],
-            mime_type=metadata["mime_type"],
-            size_bytes=metadata["size_bytes"],
-            sha256=result["sha256"],
-            expires_at=metadata["expires_at"],
-        )
+        # Store in blob storage
+        response = _upload_blob(resized_data, filename, ["resource-server", "image"], ttl_hours)
+        if PREWARM_WIDTHS and RESIZE_CACHE_MAX_BYTES:
+            _prewarm_pool.submit(_prewarm_resize_cache, response.resource_id).add_done_callback(
+                _log_prewarm_error
+            )
+        return response
 
     except ToolError:
         raise
@@ -691,6 +1433,35 @@ def upload_image_resource(
         raise ToolError(f"Failed to create image resource: {e}")
 
 
+def upload_image_item(item: ImageUploadItem) -> ResourceResponse:
+    """
+    Store one image from an upload_image_resources batch.
+
+    Same as upload_image_resource, except that failures are reported in the
+    response (success=False with error set) rather than raised, so one bad
+    image doesn't discard the blob IDs of the rest of the batch.
+
+    Args:
+        item: Image bytes, filename and resize options
+
+    Returns:
+        ResourceResponse for the stored image, or with success=False and error
+    """
+    try:
+        return upload_image_resource(
+            item.data,
+            item.filename,
+            item.max_width,
+            item.max_height,
+            item.quality,
+            item.ttl_hours,
+            item.high_quality,
+            item.palette_optimize,
+        )
+    except ToolError as e:
+        return ResourceResponse(success=False, filename=item.filename, error=str(e))
+
+
 def upload_file_resource(
     data: bytes,
     filename: str,
@@ -714,11 +1485,11 @@ def upload_file_resource(
         ResourceResponse with:
         - success: Whether the operation succeeded
         - resource_id: Unique identifier for the stored blob (format: blob://TIMESTAMP-HASH.EXT)
-        - filename: Filename of the stored file (from metadata)
-        - mime_type: MIME type of the stored file (from metadata)
-        - size_bytes: Size of the stored file in bytes (from metadata)
-        - sha256: SHA256 hash of the file data for deduplication (from upload result)
-        - expires_at: ISO 8601 timestamp when the blob expires (from metadata)
+        - filename: Filename of the stored file
+        - mime_type: MIME type of the stored file
+        - size_bytes: Size of the stored file in bytes
+        - sha256: SHA256 hash of the file data for deduplication
+        - expires_at: ISO 8601 timestamp when the blob expires
         - error: Error message if unsuccessful
 
     Raises:
@@ -743,26 +1514,7 @@ def upload_file_resource(
             raise ToolError("filename is required")
 
         # Store in blob storage
-        storage = _get_blob_storage()
-        result = storage.upload_blob(
-            data=data,
-            filename=filename,
-            tags=["resource-server", "file"],
-            ttl_hours=ttl_hours,
-        )
-
-        # Get metadata to retrieve additional fields
-        metadata = storage.get_metadata(result["blob_id"])
-
-        return ResourceResponse(
-            success=True,
-            resource_id=result["blob_id"],
-            filename=metadata["filename"],
-            mime_type=metadata["mime_type"],
-            size_bytes=metadata["size_bytes"],
-            sha256=result["sha256"],
-            expires_at=metadata["expires_at"],
-        )
+        return _upload_blob(data, filename, ["resource-server", "file"], ttl_hours)
 
     except ToolError:
         raise
@@ -821,15 +1573,14 @@ def get_file_info(blob_id: str) -> FileInfoResponse:
 
     try:
         # Get the container/process filesystem path
-        container_path = blob_id_to_path(blob_id, BLOB_STORAGE_ROOT)
+        container_path = _get_blob_path(blob_id)
 
         # Verify the blob exists
         if not os.path.exists(container_path):
             raise ToolError(f"Blob file not found: {blob_id}")
 
         # Get metadata
-        storage = _get_blob_storage()
-        metadata = storage.get_metadata(blob_id)
+        metadata = _get_blob_metadata(blob_id)
 
         # Build response with conditional host_path
         response_data = {
@@ -842,9 +1593,7 @@ def get_file_info(blob_id: str) -> FileInfoResponse:
 
         # Only include host_path if configured
         if HOST_BLOB_STORAGE_ROOT:
-            relative_path = os.path.relpath(container_path, BLOB_STORAGE_ROOT)
-            host_path = os.path.join(HOST_BLOB_STORAGE_ROOT, relative_path)
-            response_data["host_path"] = host_path
+            response_data["host_path"] = _get_host_path(container_path)
 
         return FileInfoResponse(**response_data)
 
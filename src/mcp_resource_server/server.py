@@ -4,10 +4,17 @@ MCP Resource Server - Main Entry Point
 This module sets up the FastMCP server and registers all resource tools.
 """
 
+import asyncio
+import functools
+import importlib.metadata
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Annotated
 
+import PIL
+from PIL import features
 from fastmcp import FastMCP
+from fastmcp.utilities.logging import get_logger
 from fastmcp.utilities.types import Image
 
 from mcp_resource_server import resources
@@ -16,9 +23,24 @@ from mcp_resource_server import resources
 # Server Setup
 # =============================================================================
 
+logger = get_logger(__name__)
+
 # Error masking disabled by default, can be enabled for production
 mask_errors = os.getenv("RESOURCE_SERVER_MASK_ERRORS", "false").lower() in ("true", "1", "yes")
 
+# Image decode/resize/encode is CPU-bound and runs in this pool so concurrent
+# tool calls don't serialize on the event loop. Threads (not processes) are
+# enough: PIL releases the GIL while decoding, resampling and encoding.
+image_workers = int(os.getenv("RESOURCE_SERVER_IMAGE_WORKERS", "0")) or os.cpu_count() or 1
+_image_pool = ThreadPoolExecutor(max_workers=image_workers, thread_name_prefix="image-worker")
+
+
+async def _run_image_task(func, *args):
+    """Run a CPU-bound image function in the image worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_image_pool, functools.partial(func, *args))
+
+
 mcp = FastMCP(
     name="MCP Resource Server",
     instructions="""
@@ -36,6 +58,7 @@ mcp = FastMCP(
     ### Blob Upload (Write Operations)
     - **upload_file_resource**: Store raw file bytes in blob storage
     - **upload_image_resource**: Store image bytes in blob storage with optional resizing
+    - **upload_image_resources**: Store a batch of images, resized in parallel
 
     ## Workflow
 
@@ -58,9 +81,12 @@ mcp = FastMCP(
 # File Tools
 # =============================================================================
 
+# File tools only do blob I/O, so they run in asyncio's default thread pool
+# rather than tying up image workers while waiting on disk.
+
 
 @mcp.tool()
-def get_file(
+async def get_file(
     blob_id: Annotated[str, "Blob URI (blob://TIMESTAMP-HASH.EXT)"],
 ) -> bytes:
     """
@@ -68,11 +94,11 @@ def get_file(
 
     Returns binary content from the specified blob.
     """
-    return resources.get_file(blob_id)
+    return await asyncio.to_thread(resources.get_file, blob_id)
 
 
 @mcp.tool()
-def get_file_info(
+async def get_file_info(
     blob_id: Annotated[str, "Blob URI (blob://TIMESTAMP-HASH.EXT)"],
 ) -> resources.FileInfoResponse:
     """
@@ -82,11 +108,11 @@ def get_file_info(
     you need to pass the file location to external tools or processes that need direct
     file access. Host path is only included if HOST_BLOB_STORAGE_ROOT is configured.
     """
-    return resources.get_file_info(blob_id)
+    return await asyncio.to_thread(resources.get_file_info, blob_id)
 
 
 @mcp.tool()
-def upload_file_resource(
+async def upload_file_resource(
     data: Annotated[bytes, "Raw file bytes to store"],
     filename: Annotated[str, "Filename for the stored file (e.g., 'document.pdf')"],
     ttl_hours: Annotated[int | None, "Time-to-live in hours (default: 24)"] = None,
@@ -97,7 +123,7 @@ def upload_file_resource(
     Stores raw file bytes in mapped Docker volume for access by other MCP servers.
     Returns resource identifier with metadata.
     """
-    return resources.upload_file_resource(data, filename, ttl_hours)
+    return await asyncio.to_thread(resources.upload_file_resource, data, filename, ttl_hours)
 
 
 # =============================================================================
@@ -106,11 +132,12 @@ def upload_file_resource(
 
 
 @mcp.tool()
-def get_image(
+async def get_image(
     blob_id: Annotated[str, "Blob URI (blob://TIMESTAMP-HASH.EXT)"],
     max_width: Annotated[int | None, "Max width in pixels (default: 1920 if both omitted, else calculated from aspect ratio)"] = None,
     max_height: Annotated[int | None, "Max height in pixels (default: 1080 if both omitted, else calculated from aspect ratio)"] = None,
-    quality: Annotated[int | None, "JPEG quality 1-100 (default: 85)"] = None,
+    quality: Annotated[int | None, "JPEG/WebP quality 1-100 (default: 85 JPEG, 80 WebP)"] = None,
+    high_quality: Annotated[bool, "Encode JPEGs for archival use (optimized, progressive, no chroma subsampling)"] = False,
 ) -> Image:
     """
     Retrieve and resize image from blob storage.
@@ -120,11 +147,11 @@ def get_image(
     dimension is specified, the other is calculated to maintain aspect ratio.
     Set both max_width=0 and max_height=0 to disable resizing.
     """
-    return resources.get_image(blob_id, max_width, max_height, quality)
+    return await _run_image_task(resources.get_image, blob_id, max_width, max_height, quality, high_quality)
 
 
 @mcp.tool()
-def get_image_info(
+async def get_image_info(
     blob_id: Annotated[str, "Blob URI (blob://TIMESTAMP-HASH.EXT)"],
 ) -> resources.ImageInfoResponse:
     """
@@ -132,11 +159,11 @@ def get_image_info(
 
     Returns dimensions, format, and file size for the specified blob image.
     """
-    return resources.get_image_info(blob_id)
+    return await _run_image_task(resources.get_image_info, blob_id)
 
 
 @mcp.tool()
-def get_image_size_estimate(
+async def get_image_size_estimate(
     blob_id: Annotated[str, "Blob URI (blob://TIMESTAMP-HASH.EXT)"],
     max_width: Annotated[int | None, "Max width in pixels (default: 1920 if both omitted, else calculated from aspect ratio)"] = None,
     max_height: Annotated[int | None, "Max height in pixels (default: 1080 if both omitted, else calculated from aspect ratio)"] = None,
@@ -148,17 +175,19 @@ def get_image_size_estimate(
     Predicts what get_image would return without actually resizing. Use this
     to decide if resize parameters need adjustment before retrieving.
     """
-    return resources.get_image_size_estimate(blob_id, max_width, max_height, quality)
+    return await _run_image_task(resources.get_image_size_estimate, blob_id, max_width, max_height, quality)
 
 
 @mcp.tool()
-def upload_image_resource(
+async def upload_image_resource(
     data: Annotated[bytes, "Raw image bytes to store"],
     filename: Annotated[str, "Filename for the stored image (e.g., 'photo.png')"],
     max_width: Annotated[int | None, "Max width in pixels (default: 1920 if both omitted, else calculated from aspect ratio)"] = None,
     max_height: Annotated[int | None, "Max height in pixels (default: 1080 if both omitted, else calculated from aspect ratio)"] = None,
     quality: Annotated[int | None, "JPEG quality 1-100 (default: 85)"] = None,
     ttl_hours: Annotated[int | None, "Time-to-live in hours (default: 24)"] = None,
+    high_quality: Annotated[bool, "Encode JPEGs for archival use (optimized, progressive, no chroma subsampling)"] = False,
+    palette_optimize: Annotated[bool, "Store few-colour PNGs (screenshots, diagrams) as grayscale/8-bit palette, losslessly"] = False,
 ) -> resources.ResourceResponse:
     """
     Store image bytes in shared blob storage with optional resizing.
@@ -168,7 +197,34 @@ def upload_image_resource(
     Stores image bytes in mapped Docker volume and returns resource identifier
     for access by other MCP servers.
     """
-    return resources.upload_image_resource(data, filename, max_width, max_height, quality, ttl_hours)
+    return await _run_image_task(
+        resources.upload_image_resource,
+        data,
+        filename,
+        max_width,
+        max_height,
+        quality,
+        ttl_hours,
+        high_quality,
+        palette_optimize,
+    )
+
+
+@mcp.tool()
+async def upload_image_resources(
+    images: Annotated[list[resources.ImageUploadItem], "Images to store, each with its own filename and resize options"],
+) -> list[resources.ResourceResponse]:
+    """
+    Store several images in shared blob storage in one call.
+
+    Images are resized in parallel, so a batch finishes much faster than the same
+    number of upload_image_resource calls. Returns one response per image, in
+    order; an image that fails has success=False and an error instead of failing
+    the whole batch.
+    """
+    return list(await asyncio.gather(
+        *(_run_image_task(resources.upload_image_item, item) for item in images)
+    ))
 
 
 # =============================================================================
@@ -176,8 +232,41 @@ def upload_image_resource(
 # =============================================================================
 
 
+def _log_image_backends() -> None:
+    """Log which imaging libraries resizes will use, to make slow deployments easy to diagnose."""
+    # Pillow-SIMD installs the same PIL package under its own distribution name
+    try:
+        importlib.metadata.version("pillow-simd")
+        has_pillow_simd = True
+    except importlib.metadata.PackageNotFoundError:
+        has_pillow_simd = False
+    pillow = f"Pillow-SIMD {PIL.__version__}" if has_pillow_simd else f"Pillow {PIL.__version__}"
+    libjpeg = "libjpeg-turbo" if features.check_feature("libjpeg_turbo") else "libjpeg"
+    turbojpeg = "enabled" if resources.jpeg_backend_available() else "unavailable"
+    if not resources.HAS_PYVIPS:
+        vips = "not installed"
+    else:
+        vips = "enabled" if resources.USE_VIPS else "disabled"
+    oxipng = "enabled" if resources.HAS_OXIPNG else "not installed"
+
+    logger.info(
+        "Image backends: %s (%s), TurboJPEG %s, libvips %s, oxipng %s",
+        pillow,
+        libjpeg,
+        turbojpeg,
+        vips,
+        oxipng,
+    )
+
+    if os.getenv("PILLOW_SIMD", "false").lower() in ("true", "1", "yes") and not has_pillow_simd:
+        logger.warning("PILLOW_SIMD is set but stock Pillow is installed; resizes will not use SIMD kernels")
+    if libjpeg != "libjpeg-turbo":
+        logger.warning("Pillow is not linked against libjpeg-turbo; JPEG decode and encode will be slow")
+
+
 def main():
     """Run the MCP server."""
+    _log_image_backends()
     mcp.run()
 
 
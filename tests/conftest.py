@@ -1,8 +1,12 @@
 """Test configuration for MCP Resource Server."""
 
+import io
 import os
+from unittest.mock import Mock, patch
+
 import pytest
 from mcp_mapped_resource_lib import BlobStorage
+from PIL import Image as PILImage
 
 
 @pytest.fixture
@@ -17,6 +21,14 @@ def sample_image_data():
     )
 
 
+@pytest.fixture
+def sample_jpeg_data():
+    """Sample 64x48 JPEG image for testing."""
+    output = io.BytesIO()
+    PILImage.new("RGB", (64, 48), color=(200, 30, 30)).save(output, format="JPEG")
+    return output.getvalue()
+
+
 @pytest.fixture
 def sample_file_id():
     """Sample file identifier."""
@@ -49,3 +61,22 @@ def sample_blob(blob_storage, sample_image_data):
         tags=["test", "image"]
     )
     return result
+
+
+@pytest.fixture
+def sample_jpeg_blob(blob_storage, sample_jpeg_data):
+    """Create sample JPEG blob large enough to be resized."""
+    result = blob_storage.upload_blob(
+        data=sample_jpeg_data,
+        filename="test.jpg",
+        tags=["test", "image"]
+    )
+    return result
+
+
+@pytest.fixture
+def mock_storage():
+    """Mock BlobStorage returned by resources._get_blob_storage."""
+    storage = Mock()
+    with patch("mcp_resource_server.resources._get_blob_storage", return_value=storage):
+        yield storage
@@ -1,8 +1,11 @@
 """Tests for blob storage operations."""
 
+import io
+
 import pytest
 from fastmcp.exceptions import ToolError
 from mcp_resource_server import resources
+from PIL import Image as PILImage
 
 
 class TestBlobRetrieval:
@@ -40,6 +43,32 @@ class TestBlobRetrieval:
             resources._get_blob_bytes("blob://1234567890-abcdef0123456789.txt")
 
 
+class TestMetadataCache:
+    """Test blob metadata caching."""
+
+    def test_metadata_cached_between_reads(self, blob_storage, sample_blob):
+        """Test repeated reads of a blob hit the metadata cache."""
+        import importlib
+        importlib.reload(resources)
+
+        blob_id = sample_blob['blob_id']
+        first = resources._get_blob_metadata(blob_id)
+        second = resources._get_blob_metadata(blob_id)
+
+        assert first == second
+        assert resources._cached_metadata.cache_info().hits == 1
+
+    def test_metadata_lookup_errors_not_cached(self):
+        """Test failed lookups are not cached."""
+        import importlib
+        importlib.reload(resources)
+
+        for _ in range(2):
+            with pytest.raises(ToolError, match="(not found|missing)"):
+                resources._get_blob_bytes("blob://1234567890-abcdef0123456789.txt")
+        assert resources._cached_metadata.cache_info().currsize == 0
+
+
 class TestGetImage:
     """Test get_image tool."""
 
@@ -64,6 +93,112 @@ class TestGetImage:
 
         assert image is not None
 
+    def test_get_image_cached(self, blob_storage, sample_jpeg_blob):
+        """Test repeat requests are served from the resize cache."""
+        import importlib
+        from unittest.mock import patch
+        importlib.reload(resources)
+
+        blob_id = sample_jpeg_blob['blob_id']
+        first = resources.get_image(blob_id, max_width=32)
+
+        with patch.object(resources, "_resize_image", side_effect=AssertionError("not cached")):
+            second = resources.get_image(blob_id, max_width=32)
+
+        assert second.data == first.data
+
+    def test_get_image_output_format(self, blob_storage, sample_jpeg_data, sample_jpeg_blob, monkeypatch):
+        """Test RESOURCE_SERVER_IMAGE_FORMAT converts resized images only."""
+        import importlib
+        importlib.reload(resources)
+        monkeypatch.setattr(resources, "IMAGE_OUTPUT_FORMAT", "webp")
+
+        resized = resources.get_image(sample_jpeg_blob['blob_id'], max_width=32)
+        original = resources.get_image(sample_jpeg_blob['blob_id'])
+
+        assert resized._mime_type == "image/webp"
+        assert resized.data[8:12] == b"WEBP"
+        assert original._mime_type == "image/jpeg"
+        assert original.data == sample_jpeg_data
+
+    def test_get_image_output_format_keeps_transparent_source(self, blob_storage, monkeypatch):
+        """Test images with alpha are not converted to RESOURCE_SERVER_IMAGE_FORMAT."""
+        import importlib
+        importlib.reload(resources)
+        monkeypatch.setattr(resources, "IMAGE_OUTPUT_FORMAT", "jpeg")
+        output = io.BytesIO()
+        PILImage.new("RGBA", (64, 48), (0, 120, 200, 128)).save(output, format="PNG")
+        blob = blob_storage.upload_blob(data=output.getvalue(), filename="overlay.png")
+
+        image = resources.get_image(blob['blob_id'], max_width=32)
+
+        assert image._mime_type == "image/png"
+        assert PILImage.open(io.BytesIO(image.data)).convert("RGBA").getpixel((16, 12))[3] == 128
+
+    def test_get_image_output_format_keeps_palette_transparency(self, blob_storage, monkeypatch):
+        """Test palette PNGs with a transparent colour (tRNS) keep their format too."""
+        import importlib
+        importlib.reload(resources)
+        monkeypatch.setattr(resources, "IMAGE_OUTPUT_FORMAT", "jpeg")
+        output = io.BytesIO()
+        PILImage.new("P", (64, 48), 0).save(output, format="PNG", transparency=0)
+        blob = blob_storage.upload_blob(data=output.getvalue(), filename="mask.png")
+
+        image = resources.get_image(blob['blob_id'], max_width=32)
+
+        assert image._mime_type == "image/png"
+
+    def test_get_image_output_format_error_is_tool_error(self, blob_storage, sample_jpeg_blob, monkeypatch):
+        """Test a failure choosing the output format surfaces as a ToolError."""
+        import importlib
+        from unittest.mock import patch
+        importlib.reload(resources)
+        monkeypatch.setattr(resources, "IMAGE_OUTPUT_FORMAT", "png")
+
+        with patch.object(resources, "_keeps_source_format", side_effect=AttributeError("has_transparency_data")):
+            with pytest.raises(ToolError, match="Failed to read image"):
+                resources.get_image(sample_jpeg_blob['blob_id'], max_width=32)
+
+    def test_invalid_output_format_rejected_at_import(self, monkeypatch):
+        """Test an unsupported RESOURCE_SERVER_IMAGE_FORMAT fails at startup, not per request."""
+        import importlib
+        monkeypatch.setenv("RESOURCE_SERVER_IMAGE_FORMAT", "bmp")
+        try:
+            with pytest.raises(ValueError, match="RESOURCE_SERVER_IMAGE_FORMAT"):
+                importlib.reload(resources)
+        finally:
+            monkeypatch.delenv("RESOURCE_SERVER_IMAGE_FORMAT")
+            importlib.reload(resources)
+
+    def test_get_image_no_resize_returns_original(self, blob_storage, sample_jpeg_data, sample_jpeg_blob):
+        """Test images that already fit are returned as stored, bypassing resize and cache."""
+        import importlib
+        from unittest.mock import patch
+        importlib.reload(resources)
+
+        with patch.object(resources, "_resize_image", side_effect=AssertionError("resized")):
+            image = resources.get_image(sample_jpeg_blob['blob_id'])
+
+        assert image.data == sample_jpeg_data
+        assert not resources._resize_cache
+
+    def test_resize_cache_evicts_to_budget(self, monkeypatch):
+        """Test least recently used entries are evicted to stay within the byte budget."""
+        import importlib
+        importlib.reload(resources)
+        monkeypatch.setattr(resources, "RESIZE_CACHE_MAX_BYTES", 10)
+
+        resources._cache_resize("a", b"1234")
+        resources._cache_resize("b", b"1234")
+        resources._get_cached_resize("a")
+        resources._cache_resize("c", b"1234")
+        resources._cache_resize("too-big", b"12345678901")
+
+        assert resources._get_cached_resize("a") == b"1234"
+        assert resources._get_cached_resize("b") is None
+        assert resources._get_cached_resize("c") == b"1234"
+        assert resources._get_cached_resize("too-big") is None
+
     def test_get_image_invalid_blob(self):
         """Test get_image with invalid blob ID."""
         import importlib
@@ -90,6 +225,19 @@ class TestGetImageInfo:
         assert info.format == "png"
         assert info.file_size_bytes > 0
 
+    def test_image_header_shared_with_size_estimate(self, blob_storage, sample_blob):
+        """Test get_image_info and get_image_size_estimate share the cached header read."""
+        import importlib
+        importlib.reload(resources)
+
+        blob_id = sample_blob['blob_id']
+        info = resources.get_image_info(blob_id)
+        estimate = resources.get_image_size_estimate(blob_id)
+
+        assert (estimate.original_width, estimate.original_height) == (info.width, info.height)
+        assert estimate.original_size_bytes == info.file_size_bytes
+        assert resources._get_image_header.cache_info().hits == 1
+
 
 class TestGetFile:
     """Test get_file tool."""
@@ -130,3 +278,72 @@ class TestImageSizeEstimate:
         assert estimate.original_width == 1
         assert estimate.original_height == 1
         assert estimate.format == "png"
+
+
+class TestUpload:
+    """Test upload tools against real blob storage."""
+
+    def test_upload_file_resource_roundtrip(self, blob_storage):
+        """Test an uploaded file can be read back and reports an expiry."""
+        import importlib
+        importlib.reload(resources)
+
+        response = resources.upload_file_resource(b"hello blob", "notes.txt", ttl_hours=2)
+
+        assert response.success is True
+        assert response.filename == "notes.txt"
+        assert response.size_bytes == len(b"hello blob")
+        assert response.expires_at is not None
+        assert resources.get_file(response.resource_id) == b"hello blob"
+
+    def test_upload_deduplicated_reports_original_blob(self, blob_storage, sample_image_data):
+        """Test re-uploading existing content, even within the same second, reports the original blob."""
+        import importlib
+        importlib.reload(resources)
+
+        original = resources.upload_file_resource(sample_image_data, "test.png", ttl_hours=2)
+        response = resources.upload_file_resource(sample_image_data, "copy.png", ttl_hours=48)
+
+        assert response.resource_id == original.resource_id
+        assert response.filename == "test.png"
+        assert response.expires_at == original.expires_at
+
+    def test_upload_image_prewarms_resize_cache(self, blob_storage, sample_jpeg_data, monkeypatch):
+        """Test PREWARM_WIDTHS variants are rendered after the upload returns and served from the cache."""
+        import importlib
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest.mock import patch
+        importlib.reload(resources)
+        pool = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(resources, "_prewarm_pool", pool)
+        monkeypatch.setattr(resources, "PREWARM_WIDTHS", (32, 128))
+
+        # Hold the pre-render worker so the upload can only return if it doesn't wait for it
+        release = threading.Event()
+        pool.submit(release.wait)
+        response = resources.upload_image_resource(sample_jpeg_data, "photo.jpg")
+        assert not resources._resize_cache
+
+        release.set()
+        pool.shutdown(wait=True)
+
+        # 128 is wider than the image, so only the 32px variant is cached
+        assert len(resources._resize_cache) == 1
+        with patch.object(resources, "_resize_image", side_effect=AssertionError("not prewarmed")):
+            image = resources.get_image(response.resource_id, max_width=32)
+        assert PILImage.open(io.BytesIO(image.data)).size == (32, 24)
+
+    def test_prewarm_failure_is_logged(self, blob_storage, sample_jpeg_blob, monkeypatch, caplog):
+        """Test a variant that fails to render is logged and skipped."""
+        import importlib
+        from unittest.mock import patch
+        importlib.reload(resources)
+        monkeypatch.setattr(resources, "PREWARM_WIDTHS", (32,))
+
+        with patch.object(resources, "_resize_image", side_effect=OSError("broken data stream")):
+            with caplog.at_level("WARNING"):
+                resources._prewarm_resize_cache(sample_jpeg_blob['blob_id'])
+
+        assert not resources._resize_cache
+        assert "broken data stream" in caplog.text
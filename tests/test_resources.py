@@ -1,11 +1,15 @@
 """Tests for resource module."""
 
+import io
 import os
+import time
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 
 import pytest
-import responses
 from fastmcp.exceptions import ToolError
+from mcp_mapped_resource_lib import InvalidBlobIdError, sanitize_filename
+from PIL import Image as PILImage
 
 from mcp_resource_server import resources
 
@@ -13,145 +17,291 @@ from mcp_resource_server import resources
 class TestImageProcessing:
     """Test image processing functionality."""
 
-    def test_calculate_resize_dimensions_no_resize_needed(self):
-        """Test when image is already smaller than max dimensions."""
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=512,
-            original_height=384,
-            max_width=1024,
-            max_height=1024,
+    @pytest.mark.parametrize(
+        "original_size, max_size, expected",
+        [
+            pytest.param((512, 384), (1024, 1024), (512, 384, False), id="no_resize_needed"),
+            pytest.param((2048, 1536), (1024, 1024), (1024, 768, True), id="with_resize"),
+            pytest.param((2048, 1536), (0, 0), (2048, 1536, False), id="disable_resize"),
+            pytest.param((3840, 2160), (None, None), (1920, 1080, True), id="both_none_uses_defaults"),
+            pytest.param((800, 600), (None, None), (800, 600, False), id="both_none_no_upscale"),
+            pytest.param((2048, 1536), (800, None), (800, 600, True), id="only_width_specified"),
+            pytest.param((2048, 1536), (None, 600), (800, 600, True), id="only_height_specified"),
+            pytest.param((2048, 1536), (0, 600), (800, 600, True), id="width_zero_height_specified"),
+            pytest.param((2048, 1536), (800, 0), (800, 600, True), id="height_zero_width_specified"),
+            pytest.param((1536, 2048), (600, None), (600, 800, True), id="portrait_width_only"),
+            pytest.param((1536, 2048), (None, 800), (600, 800, True), id="portrait_height_only"),
+            # The limiting axis lands exactly on its maximum (no float truncation)
+            pytest.param((77, 1), (5, 5), (5, 1, True), id="exact_limiting_axis"),
+        ],
+    )
+    def test_calculate_resize_dimensions(self, original_size, max_size, expected):
+        """Test target dimensions for each combination of max_width/max_height."""
+        assert resources._calculate_resize_dimensions(*original_size, *max_size) == expected
+
+    def test_resize_image_jpeg(self, sample_jpeg_data):
+        """Test JPEG resize produces a JPEG of the calculated dimensions."""
+        data, width, height = resources._resize_image(sample_jpeg_data, "jpeg", 32, None, None)
+        assert (width, height) == (32, 24)
+        img = PILImage.open(io.BytesIO(data))
+        assert img.format == "JPEG"
+        assert img.size == (32, 24)
+
+    def test_resize_image_png(self):
+        """Test PNG resize produces a PNG of the calculated dimensions."""
+        output = io.BytesIO()
+        PILImage.new("RGBA", (64, 48), color=(0, 120, 200, 255)).save(output, format="PNG")
+        data, width, height = resources._resize_image(output.getvalue(), "png", 32, None, None)
+        img = PILImage.open(io.BytesIO(data))
+        assert img.format == "PNG"
+        assert img.size == (width, height) == (32, 24)
+        assert img.convert("RGBA").getpixel((0, 0)) == (0, 120, 200, 255)
+
+    def test_resize_image_detects_format(self, sample_jpeg_data):
+        """Test image_format=None keeps the format detected from the data."""
+        data, _, _ = resources._resize_image(sample_jpeg_data, None, 32, None, None)
+        assert PILImage.open(io.BytesIO(data)).format == "JPEG"
+
+    def test_resize_image_rgba_to_jpeg(self):
+        """Test images with alpha are converted to RGB for JPEG output."""
+        output = io.BytesIO()
+        PILImage.new("RGBA", (64, 48), color=(0, 120, 200, 255)).save(output, format="PNG")
+        data, width, height = resources._resize_image(output.getvalue(), "jpeg", 32, None, None)
+        img = PILImage.open(io.BytesIO(data))
+        assert img.format == "JPEG"
+        assert img.mode == "RGB"
+        assert img.size == (32, 24)
+
+    def test_resize_image_jpeg_large_reduction(self, sample_jpeg_data):
+        """Test JPEG downscale beyond the 1/8 DCT scale keeps exact dimensions."""
+        data, width, height = resources._resize_image(sample_jpeg_data, "jpeg", 5, None, None)
+        assert (width, height) == (5, 3)
+        assert PILImage.open(io.BytesIO(data)).size == (5, 3)
+
+    def test_resize_image_jpeg_high_quality(self, sample_jpeg_data):
+        """Test high_quality switches JPEG output from baseline 4:2:0 to progressive 4:4:4."""
+        from PIL import JpegImagePlugin
+
+        fast, _, _ = resources._resize_image(sample_jpeg_data, "jpeg", 32, None, None)
+        archival, _, _ = resources._resize_image(sample_jpeg_data, "jpeg", 32, None, None, high_quality=True)
+
+        fast_img = PILImage.open(io.BytesIO(fast))
+        archival_img = PILImage.open(io.BytesIO(archival))
+        assert not fast_img.info.get("progressive")
+        assert JpegImagePlugin.get_sampling(fast_img) == 2
+        assert archival_img.info.get("progressive")
+        assert JpegImagePlugin.get_sampling(archival_img) == 0
+
+    def test_resize_image_to_webp(self, sample_jpeg_data):
+        """Test resized output can be re-encoded as WebP, honouring quality."""
+        low, width, height = resources._resize_image(sample_jpeg_data, "webp", 32, None, 10)
+        default, _, _ = resources._resize_image(sample_jpeg_data, "webp", 32, None, None)
+
+        assert (width, height) == (32, 24)
+        assert PILImage.open(io.BytesIO(low)).format == "WEBP"
+        assert len(low) < len(default)
+
+    def test_resize_image_converts_unsupported_modes(self):
+        """Test conversions to another format normalize modes the target can't store."""
+        output = io.BytesIO()
+        PILImage.new("CMYK", (64, 48), (0, 255, 255, 0)).save(output, format="JPEG")
+        data, _, _ = resources._resize_image(output.getvalue(), "png", 32, None, None)
+        img = PILImage.open(io.BytesIO(data))
+        assert img.format == "PNG"
+        assert img.convert("RGB").getpixel((16, 12)) == (255, 0, 0)
+
+        # 16-bit samples are scaled to 8 bits, not clipped to white
+        output = io.BytesIO()
+        PILImage.new("I;16", (64, 48), 32768).save(output, format="PNG")
+        data, _, _ = resources._resize_image(output.getvalue(), "jpeg", 32, None, None)
+        img = PILImage.open(io.BytesIO(data))
+        assert (img.format, img.mode) == ("JPEG", "L")
+        assert 120 <= img.getpixel((16, 12)) <= 136
+
+    def test_resize_image_jpeg_uses_draft(self, monkeypatch, sample_jpeg_data):
+        """Test the PIL path decodes JPEGs at a reduced DCT scale before resampling."""
+        monkeypatch.setattr(resources, "_get_jpeg_codec", lambda: None)
+        decoded_sizes = []
+        original_resize = PILImage.Image.resize
+
+        def recording_resize(img, *args, **kwargs):
+            decoded_sizes.append(img.size)
+            return original_resize(img, *args, **kwargs)
+
+        with patch.object(PILImage.Image, "resize", recording_resize):
+            _, width, height = resources._resize_image(sample_jpeg_data, "jpeg", 10, None, None)
+
+        assert (width, height) == (10, 7)
+        # 64x48 at 1/4 scale still covers 10x7, so draft() shrinks the decode to 16x12
+        assert decoded_sizes == [(16, 12)]
+
+    def test_resize_image_no_resize_skips_decode(self, sample_jpeg_data):
+        """Test images that already fit are returned untouched without decoding pixels."""
+        with patch("PIL.ImageFile.ImageFile.load", side_effect=AssertionError("decoded")):
+            data, width, height = resources._resize_image(sample_jpeg_data, "jpeg", None, None, None)
+        assert data is sample_jpeg_data
+        assert (width, height) == (64, 48)
+
+    def test_resize_image_from_mmap(self, tmp_path, sample_jpeg_data):
+        """Test resizing straight from a memory-mapped blob file."""
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(sample_jpeg_data)
+        with resources._map_blob_file(str(path)) as mm:
+            data, width, height = resources._resize_image(mm, "jpeg", 32, None, None)
+            unchanged, _, _ = resources._resize_image(mm, "jpeg", 0, 0, None)
+        assert (width, height) == (32, 24)
+        assert isinstance(data, bytes)
+        assert unchanged == sample_jpeg_data
+
+    def test_resize_image_vips(self, monkeypatch, sample_jpeg_data):
+        """Test the libvips backend produces the same dimensions as PIL."""
+        if not resources.HAS_PYVIPS:
+            pytest.skip("pyvips/libvips not installed")
+        monkeypatch.setattr(resources, "USE_VIPS", True)
+        data, width, height = resources._resize_image(sample_jpeg_data, "jpeg", 5, None, None)
+        assert (width, height) == (5, 3)
+        img = PILImage.open(io.BytesIO(data))
+        assert img.format == "JPEG"
+        assert img.size == (5, 3)
+
+    def test_resize_image_vips_chroma_subsampling(self, monkeypatch, sample_jpeg_data):
+        """Test libvips subsamples chroma like PIL unless high_quality is set, even at high quality values."""
+        from PIL import JpegImagePlugin
+
+        if not resources.HAS_PYVIPS:
+            pytest.skip("pyvips/libvips not installed")
+        monkeypatch.setattr(resources, "USE_VIPS", True)
+
+        fast, _, _ = resources._resize_image(sample_jpeg_data, "jpeg", 5, None, 95)
+        archival, _, _ = resources._resize_image(sample_jpeg_data, "jpeg", 5, None, 95, high_quality=True)
+
+        assert JpegImagePlugin.get_sampling(PILImage.open(io.BytesIO(fast))) == 2
+        assert JpegImagePlugin.get_sampling(PILImage.open(io.BytesIO(archival))) == 0
+
+    def test_resize_image_vips_mmap(self, monkeypatch, tmp_path, sample_jpeg_data):
+        """Test the libvips backend accepts the memory-mapped blob files get_image passes."""
+        if not resources.HAS_PYVIPS:
+            pytest.skip("pyvips/libvips not installed")
+        monkeypatch.setattr(resources, "USE_VIPS", True)
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(sample_jpeg_data)
+
+        with patch.object(resources, "_decode_image", side_effect=AssertionError("fell back to PIL")):
+            with resources._map_blob_file(str(path)) as mm:
+                data, width, height = resources._resize_image(mm, "jpeg", 5, None, None)
+
+        assert (width, height) == (5, 3)
+        assert PILImage.open(io.BytesIO(data)).size == (5, 3)
+
+    def test_reduce_png_colors(self):
+        """Test few-colour and gray images are reduced losslessly, others left alone."""
+        two_colors = PILImage.new("RGB", (8, 8), (255, 0, 0))
+        two_colors.paste((0, 0, 255), (0, 0, 4, 8))
+        reduced = resources._reduce_png_colors(two_colors)
+        assert reduced.mode == "P"
+        assert reduced.convert("RGB").tobytes() == two_colors.tobytes()
+
+        gray = PILImage.linear_gradient("L").convert("RGB")
+        assert resources._reduce_png_colors(gray).mode == "L"
+
+        transparent = PILImage.new("RGBA", (8, 8), (255, 0, 0, 128))
+        assert resources._reduce_png_colors(transparent) is None
+
+        gradient = PILImage.linear_gradient("L")
+        colorful = PILImage.merge("RGB", (gradient, gradient.rotate(90), gradient))
+        assert resources._reduce_png_colors(colorful) is None
+
+    def test_resize_image_palette_optimize_without_resize(self):
+        """Test palette_optimize re-encodes fitting PNGs as palette images."""
+        source = PILImage.new("RGB", (64, 48), (0, 120, 200))
+        source.paste((250, 250, 250), (0, 0, 32, 48))
+        output = io.BytesIO()
+        source.save(output, format="PNG")
+
+        data, width, height = resources._resize_image(
+            output.getvalue(), "png", None, None, None, palette_optimize=True
         )
-        assert width == 512
-        assert height == 384
-        assert should_resize is False
-
-    def test_calculate_resize_dimensions_with_resize(self):
-        """Test when image needs resizing."""
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=2048,
-            original_height=1536,
-            max_width=1024,
-            max_height=1024,
-        )
-        assert width == 1024
-        assert height == 768
-        assert should_resize is True
-
-    def test_calculate_resize_dimensions_disable_resize(self):
-        """Test disabling resize with both dimensions = 0."""
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=2048,
-            original_height=1536,
-            max_width=0,
-            max_height=0,
-        )
-        assert width == 2048
-        assert height == 1536
-        assert should_resize is False
-
-    def test_calculate_resize_dimensions_both_none_uses_defaults(self):
-        """Test that both None uses 1920x1080 defaults."""
-        # Image larger than defaults should be resized
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=3840,
-            original_height=2160,
-            max_width=None,
-            max_height=None,
-        )
-        assert width == 1920
-        assert height == 1080
-        assert should_resize is True
-
-    def test_calculate_resize_dimensions_both_none_no_upscale(self):
-        """Test that both None doesn't upscale small images."""
-        # Image smaller than defaults should not be resized
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=800,
-            original_height=600,
-            max_width=None,
-            max_height=None,
-        )
-        assert width == 800
-        assert height == 600
-        assert should_resize is False
-
-    def test_calculate_resize_dimensions_only_width_specified(self):
-        """Test only max_width specified, height calculated from aspect ratio."""
-        # 2048x1536 with max_width=800 should give 800x600
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=2048,
-            original_height=1536,
-            max_width=800,
-            max_height=None,
-        )
-        assert width == 800
-        assert height == 600
-        assert should_resize is True
-
-    def test_calculate_resize_dimensions_only_height_specified(self):
-        """Test only max_height specified, width calculated from aspect ratio."""
-        # 2048x1536 with max_height=600 should give 800x600
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=2048,
-            original_height=1536,
-            max_width=None,
-            max_height=600,
-        )
-        assert width == 800
-        assert height == 600
-        assert should_resize is True
-
-    def test_calculate_resize_dimensions_width_zero_height_specified(self):
-        """Test max_width=0 with max_height specified (no width constraint)."""
-        # 2048x1536 with max_width=0, max_height=600 should give 800x600
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=2048,
-            original_height=1536,
-            max_width=0,
-            max_height=600,
-        )
-        assert width == 800
-        assert height == 600
-        assert should_resize is True
-
-    def test_calculate_resize_dimensions_height_zero_width_specified(self):
-        """Test max_height=0 with max_width specified (no height constraint)."""
-        # 2048x1536 with max_width=800, max_height=0 should give 800x600
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=2048,
-            original_height=1536,
-            max_width=800,
-            max_height=0,
-        )
-        assert width == 800
-        assert height == 600
-        assert should_resize is True
-
-    def test_calculate_resize_dimensions_portrait_image_width_only(self):
-        """Test portrait image with only width specified."""
-        # 1536x2048 (portrait) with max_width=600 should give 600x800
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=1536,
-            original_height=2048,
-            max_width=600,
-            max_height=None,
-        )
-        assert width == 600
-        assert height == 800
-        assert should_resize is True
-
-    def test_calculate_resize_dimensions_portrait_image_height_only(self):
-        """Test portrait image with only height specified."""
-        # 1536x2048 (portrait) with max_height=800 should give 600x800
-        width, height, should_resize = resources._calculate_resize_dimensions(
-            original_width=1536,
-            original_height=2048,
-            max_width=None,
-            max_height=800,
-        )
-        assert width == 600
-        assert height == 800
-        assert should_resize is True
+        img = PILImage.open(io.BytesIO(data))
+        assert (width, height) == (64, 48)
+        assert img.mode == "P"
+        assert img.convert("RGB").tobytes() == source.tobytes()
+
+    def test_select_resample_filter(self):
+        """Test cheaper filters are used as the downscale ratio grows."""
+        select = resources._select_resample_filter
+        assert select((1000, 800), (800, 640)) == PILImage.Resampling.LANCZOS
+        assert select((1000, 800), (500, 400)) == PILImage.Resampling.BILINEAR
+        assert select((1000, 800), (250, 200)) == PILImage.Resampling.BOX
+        # The larger of the two axis ratios decides
+        assert select((1000, 800), (900, 200)) == PILImage.Resampling.BOX
+
+    def test_read_image_header(self, tmp_path, sample_jpeg_data):
+        """Test reading dimensions and format from the image header."""
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(sample_jpeg_data)
+        assert resources._read_image_header(str(path)) == (64, 48, "JPEG")
+
+    def test_decode_image_non_jpeg_unchanged(self, sample_image_data):
+        """Test non-JPEG images are left to PIL."""
+        img = PILImage.open(io.BytesIO(sample_image_data))
+        assert resources._decode_image(img, sample_image_data, (1, 1)) is img
+
+    def test_resize_image_turbojpeg_scaled_decode(self, monkeypatch, sample_jpeg_data):
+        """Test TurboJPEG decodes at the smallest scaling factor covering the target size."""
+        np = pytest.importorskip("numpy")
+
+        class StubCodec:
+            scaling_factors = frozenset({(1, 8), (1, 4), (3, 8), (1, 2), (1, 1), (2, 1)})
+
+            def __init__(self):
+                self.scaling_factor = None
+
+            def decode_header(self, data):
+                return 64, 48, 2, resources.TJCS_YCbCr
+
+            def decode(self, data, pixel_format, scaling_factor):
+                self.scaling_factor = scaling_factor
+                num, denom = scaling_factor
+                return np.full((48 * num // denom, 64 * num // denom, 3), (200, 30, 30), dtype=np.uint8)
+
+        codec = StubCodec()
+        for name, value in [("TJCS_RGB", 0), ("TJCS_YCbCr", 1), ("TJCS_GRAY", 2), ("TJPF_RGB", 0), ("TJPF_GRAY", 6)]:
+            monkeypatch.setattr(resources, name, value, raising=False)
+        monkeypatch.setattr(resources, "_get_jpeg_codec", lambda: codec)
+        monkeypatch.setattr(resources, "USE_VIPS", False)
+
+        data, width, height = resources._resize_image(sample_jpeg_data, "jpeg", 16, None, None)
+
+        # 1/8 gives 8x6, too small for 16x12; 1/4 gives exactly 16x12
+        assert codec.scaling_factor == (1, 4)
+        assert (width, height) == (16, 12)
+        assert PILImage.open(io.BytesIO(data)).size == (16, 12)
+
+    def test_jpeg_backend_available(self, monkeypatch):
+        """Test the TurboJPEG backend reports unavailable when no codec can be created."""
+        monkeypatch.setattr(resources, "_get_jpeg_codec", lambda: None)
+        assert resources.jpeg_backend_available() is False
+        monkeypatch.setattr(resources, "_get_jpeg_codec", lambda: object())
+        assert resources.jpeg_backend_available() is True
+
+    def test_estimate_compressed_size(self):
+        """Test size estimate scales by pixel ratio and the JPEG quality curve."""
+        # Quarter of the pixels, no quality factor
+        assert resources._estimate_compressed_size(40000, 200, 100, 100, 50, None) == 10000
+        # Quarter of the pixels at the default quality
+        assert resources._estimate_compressed_size(40000, 200, 100, 100, 50, 85) == 10000
+        # Higher quality grows the output faster than linearly
+        assert resources._estimate_compressed_size(40000, 200, 100, 100, 50, 95) > 16000
+        assert resources._estimate_compressed_size(40000, 200, 100, 100, 50, 50) < 5000
+        # Never below the 100 byte floor
+        assert resources._estimate_compressed_size(200, 200, 100, 10, 5, None) == 100
+
+    def test_get_image_format(self):
+        """Test MIME types map to image format names."""
+        assert resources._get_image_format("image/png") == "png"
+        assert resources._get_image_format("image/jpg") == "jpeg"
+        assert resources._get_image_format("image/jpeg; charset=binary") == "jpeg"
+        assert resources._get_image_format("image/bmp") == "bmp"
 
     def test_validate_quality_valid(self):
         """Test quality validation with valid values."""
@@ -168,6 +318,73 @@ class TestImageProcessing:
             resources._validate_quality(101)
 
 
+class TestBlobStorageSingleton:
+    """Test the shared blob storage instance."""
+
+    def test_get_blob_storage_created_once_across_threads(self, monkeypatch):
+        """Test concurrent first calls share a single storage instance."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def slow_storage(**kwargs):
+            time.sleep(0.01)
+            return Mock()
+
+        monkeypatch.setattr(resources, "_blob_storage", None)
+        monkeypatch.setattr(resources, "BlobStorage", Mock(side_effect=slow_storage))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            instances = list(pool.map(lambda _: resources._get_blob_storage(), range(8)))
+
+        assert all(instance is instances[0] for instance in instances)
+        assert resources.BlobStorage.call_count == 1
+
+
+class TestBlobPath:
+    """Test blob ID to path resolution."""
+
+    def test_get_blob_path_cached(self):
+        """Test valid IDs are resolved once and invalid IDs are not cached."""
+        resources._get_blob_path.cache_clear()
+        blob_id = "blob://1733437200-a3f9d8c2b1e4f6a7.png"
+
+        path = resources._get_blob_path(blob_id)
+        assert path == os.path.join(resources.BLOB_STORAGE_ROOT, "17", "33", "1733437200-a3f9d8c2b1e4f6a7.png")
+        assert resources._get_blob_path(blob_id) == path
+        assert resources._get_blob_path.cache_info().hits == 1
+
+        with pytest.raises(InvalidBlobIdError):
+            resources._get_blob_path("blob://not-a-blob")
+        assert resources._get_blob_path.cache_info().currsize == 1
+
+
+class TestHostPath:
+    """Test mapping blob paths onto the host storage root."""
+
+    def test_get_host_path(self, monkeypatch):
+        """Test the storage root prefix is swapped for the host root."""
+        monkeypatch.setattr(resources, "BLOB_STORAGE_ROOT", "/mnt/blob-storage")
+        monkeypatch.setattr(resources, "HOST_BLOB_STORAGE_ROOT", "/workspace/blobs")
+        monkeypatch.setattr(resources, "_BLOB_STORAGE_ROOT_PREFIX", "/mnt/blob-storage/")
+        monkeypatch.setattr(resources, "_HOST_BLOB_STORAGE_ROOT_PREFIX", "/workspace/blobs/")
+
+        assert (
+            resources._get_host_path("/mnt/blob-storage/17/33/1733437200-a3f9d8c2b1e4f6a7.png")
+            == "/workspace/blobs/17/33/1733437200-a3f9d8c2b1e4f6a7.png"
+        )
+
+    def test_get_host_path_unnormalized_root(self, monkeypatch):
+        """Test a root with doubled separators falls back to relpath."""
+        monkeypatch.setattr(resources, "BLOB_STORAGE_ROOT", "/mnt//blob-storage/")
+        monkeypatch.setattr(resources, "HOST_BLOB_STORAGE_ROOT", "/workspace/blobs")
+        monkeypatch.setattr(resources, "_BLOB_STORAGE_ROOT_PREFIX", "/mnt//blob-storage/")
+        monkeypatch.setattr(resources, "_HOST_BLOB_STORAGE_ROOT_PREFIX", "/workspace/blobs/")
+
+        assert (
+            resources._get_host_path("/mnt/blob-storage/17/33/1733437200-a3f9d8c2b1e4f6a7.png")
+            == "/workspace/blobs/17/33/1733437200-a3f9d8c2b1e4f6a7.png"
+        )
+
+
 class TestDataclasses:
     """Test response dataclasses."""
 
@@ -202,13 +419,8 @@ class TestDataclasses:
 class TestBlobStorageIntegration:
     """Test blob storage integration with upload_*_resource functions."""
 
-    @patch('mcp_resource_server.resources._get_blob_storage')
-    def test_upload_image_resource_success(self, mock_get_storage, sample_image_data):
+    def test_upload_image_resource_success(self, mock_storage, sample_image_data):
         """Test upload_image_resource returns correct metadata from storage."""
-        # Mock storage and its methods
-        mock_storage = Mock()
-        mock_get_storage.return_value = mock_storage
-
         # Mock upload_blob to return only blob_id, file_path, sha256 (per mcp_mapped_resource_lib)
         mock_storage.upload_blob.return_value = {
             "blob_id": "blob://1234567890-abcdef123456.png",
@@ -243,15 +455,10 @@ class TestBlobStorageIntegration:
         # Verify get_metadata was called
         mock_storage.get_metadata.assert_called_once_with("blob://1234567890-abcdef123456.png")
 
-    @patch('mcp_resource_server.resources._get_blob_storage')
-    def test_upload_file_resource_success(self, mock_get_storage):
+    def test_upload_file_resource_success(self, mock_storage):
         """Test upload_file_resource returns correct metadata from storage."""
         test_data = b"test file content"
 
-        # Mock storage and its methods
-        mock_storage = Mock()
-        mock_get_storage.return_value = mock_storage
-
         # Mock upload_blob to return only blob_id, file_path, sha256 (per mcp_mapped_resource_lib)
         mock_storage.upload_blob.return_value = {
             "blob_id": "blob://1234567890-fedcba654321.pdf",
@@ -286,18 +493,55 @@ class TestBlobStorageIntegration:
         # Verify get_metadata was called
         mock_storage.get_metadata.assert_called_once_with("blob://1234567890-fedcba654321.pdf")
 
+    def test_upload_file_resource_new_blob(self, mock_storage):
+        """Test a newly created blob's response takes filename and expiry from its metadata."""
+        blob_id = f"blob://{int(time.time())}-fedcba6543210fed.pdf"
+        created_at = datetime.now(timezone.utc)
+        mock_storage.upload_blob.return_value = {
+            "blob_id": blob_id,
+            "size_bytes": 4,
+            "mime_type": "application/pdf",
+            "file_path": "/mnt/blob-storage/unused",
+            "sha256": "fed123cba456",
+        }
+        # Metadata as mcp_mapped_resource_lib writes it: created_at + ttl_hours, no expires_at
+        mock_storage.get_metadata.return_value = {
+            "blob_id": blob_id,
+            "filename": sanitize_filename("my datasheet.pdf"),
+            "mime_type": "application/pdf",
+            "size_bytes": 4,
+            "sha256": "fed123cba456",
+            "created_at": created_at.isoformat(),
+            "ttl_hours": 48,
+        }
+
+        response = resources.upload_file_resource(b"test", "my datasheet.pdf", ttl_hours=48)
+
+        mock_storage.get_metadata.assert_called_once_with(blob_id)
+        assert response.resource_id == blob_id
+        assert response.filename == sanitize_filename("my datasheet.pdf")
+        assert response.mime_type == "application/pdf"
+        assert response.size_bytes == 4
+        assert datetime.fromisoformat(response.expires_at) == created_at + timedelta(hours=48)
+
     def test_upload_image_resource_not_an_image(self):
         """Test upload_image_resource fails when file is not an image."""
         # Should raise ToolError when trying to open non-image bytes
         with pytest.raises(ToolError, match="Failed to create image resource"):
             resources.upload_image_resource(b"not an image", "file.pdf")
 
-    @patch('mcp_resource_server.resources._get_blob_storage')
-    def test_upload_file_resource_storage_error(self, mock_get_storage):
+    def test_upload_image_item_reports_failure(self):
+        """Test upload_image_item returns an error response instead of raising."""
+        item = resources.ImageUploadItem(data=b"not an image", filename="file.pdf")
+        response = resources.upload_image_item(item)
+
+        assert response.success is False
+        assert response.filename == "file.pdf"
+        assert "Failed to create image resource" in response.error
+
+    def test_upload_file_resource_storage_error(self, mock_storage):
         """Test upload_file_resource handles storage errors."""
         # Mock storage to raise exception
-        mock_storage = Mock()
-        mock_get_storage.return_value = mock_storage
         mock_storage.upload_blob.side_effect = Exception("Storage full")
 
         # Should raise ToolError with wrapped message